@@ -0,0 +1,113 @@
+import asyncio
+import contextvars
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+import metrics
+
+
+class Overloaded(Exception):
+    def __init__(self, retry_after):
+        super().__init__("❌ Inference queue is full.")
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+# ✅ Bounded Inference Executor with an Admission Queue and Per-Request Deadlines
+# At most `workers` jobs run and `max_queue` more wait; anything beyond that is refused at once
+# (Overloaded) instead of piling up. A job still queued when its deadline passes is never started,
+# and the caller stops waiting for one that is running. Other endpoints keep the default threadpool.
+class AdmissionGate:
+    def __init__(self, workers=2, max_queue=32, name="inference", profile_scope=nullcontext):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.name = name
+        self.profile_scope = profile_scope  # 🔹 Context manager factory wrapped around each job (profiler hook)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._occupied = 0  # 🔹 Running + queued jobs (released when the job really finishes)
+        self._service_seconds = None  # 🔹 Moving average of job run time, for Retry-After
+
+        self.admitted = 0
+        self.rejected = 0
+        self.expired_in_queue = 0
+        self.timed_out = 0
+        self.completed = 0
+
+    @property
+    def capacity(self):
+        return self.workers + self.max_queue
+
+    # 🔹 Seconds Until a Slot Is Likely Free: Jobs Ahead per Worker x Average Run Time
+    def retry_after(self):
+        average = self._service_seconds or 1.0
+        return max(1, math.ceil(self._occupied / self.workers * average))
+
+    async def run(self, fn, deadline):
+        with self._lock:
+            if self._occupied >= self.capacity:
+                self.rejected += 1
+                raise Overloaded(self.retry_after())
+            self._occupied += 1
+            self.admitted += 1
+
+        submitted = time.perf_counter()
+
+        def job():
+            metrics.record_stage("admission_wait", time.perf_counter() - submitted)
+            if time.monotonic() >= deadline:
+                with self._lock:
+                    self.expired_in_queue += 1
+                raise DeadlineExceeded("❌ Request expired while queued.")
+            start = time.perf_counter()
+            try:
+                with self.profile_scope():
+                    return fn()
+            finally:
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    self.completed += 1
+                    self._service_seconds = elapsed if self._service_seconds is None else 0.9 * self._service_seconds + 0.1 * elapsed
+
+        try:
+            future = self._executor.submit(contextvars.copy_context().run, job)  # 🔹 Keeps the request's stage timings
+        except RuntimeError:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timed_out += 1
+            raise DeadlineExceeded("❌ Request deadline exceeded.")
+
+    def _release(self, _future):
+        with self._lock:
+            self._occupied -= 1
+
+    # 🔹 Drop Queued Jobs; a Fresh Executor Serves Any Later Requests
+    def shutdown(self):
+        executor, self._executor = self._executor, ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=self.name)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._occupied,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "expired_in_queue": self.expired_in_queue,
+                "timed_out": self.timed_out,
+                "completed": self.completed,
+                "mean_service_ms": round(self._service_seconds * 1000, 3) if self._service_seconds else None,
+            }
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from domain_index import normalize_rows
+
+# 🔹 Layout: <root>/<version>/{manifest.json, domain_vectors.npy} plus <root>/CURRENT naming the live version
+ARTIFACT_FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+VECTORS_FILE = "domain_vectors.npy"
+CURRENT_FILE = "CURRENT"
+
+
+class ArtifactBundle:
+    def __init__(self, path, manifest, vectors):
+        self.path = path
+        self.manifest = manifest
+        self.vectors = vectors  # 🔹 Read-only memory map, shared between workers via the page cache
+
+    @property
+    def version(self):
+        return self.manifest["version"]
+
+    @property
+    def model_id(self):
+        return self.manifest["model_id"]
+
+    @property
+    def embedding_dim(self):
+        return self.manifest["embedding_dim"]
+
+    @property
+    def labels(self):
+        return self.manifest["labels"]
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _content_hash(model_id, labels, vectors_sha256):
+    payload = json.dumps({"model_id": model_id, "labels": labels, "vectors": vectors_sha256}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+# 🔹 Write a New Bundle Version Atomically and Point CURRENT at It
+def write_artifact_bundle(root, model_id, labels, vectors):
+    vectors = normalize_rows(vectors)
+    labels = list(labels)
+    if vectors.shape[0] != len(labels):
+        raise ValueError(f"❌ {vectors.shape[0]} domain vectors but {len(labels)} labels.")
+
+    os.makedirs(root, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=".staging-", dir=root)
+    os.chmod(staging, 0o755)
+    try:
+        vectors_path = os.path.join(staging, VECTORS_FILE)
+        np.save(vectors_path, vectors)
+        vectors_sha256 = _file_sha256(vectors_path)
+        content_hash = _content_hash(model_id, labels, vectors_sha256)
+
+        manifest = {
+            "format_version": ARTIFACT_FORMAT_VERSION,
+            "version": content_hash[:12],
+            "content_hash": content_hash,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "model_id": model_id,
+            "embedding_dim": int(vectors.shape[1]),
+            "normalized": True,
+            "labels": labels,
+            "vectors_file": VECTORS_FILE,
+            "vectors_sha256": vectors_sha256,
+        }
+        with open(os.path.join(staging, MANIFEST_FILE), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+        # 🔹 Same content = same version, so an identical rebuild is a no-op
+        version_path = os.path.join(root, manifest["version"])
+        if os.path.exists(version_path):
+            shutil.rmtree(staging)
+        else:
+            os.rename(staging, version_path)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    _write_current(root, manifest["version"])
+    return manifest
+
+def _write_current(root, version):
+    fd, tmp_path = tempfile.mkstemp(prefix=".current-", dir=root)
+    with os.fdopen(fd, "w") as f:
+        f.write(version + "\n")
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, os.path.join(root, CURRENT_FILE))
+
+def current_version(root):
+    with open(os.path.join(root, CURRENT_FILE)) as f:
+        return f.read().strip()
+
+# 🔹 Load a Bundle (CURRENT by default), Memory-Mapping the Domain Vectors
+def load_artifact_bundle(root, version=None, verify=False):
+    version = version or current_version(root)
+    path = os.path.join(root, version)
+
+    with open(os.path.join(path, MANIFEST_FILE), encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    if manifest.get("format_version") != ARTIFACT_FORMAT_VERSION:
+        raise RuntimeError(f"❌ Unsupported artifact format: {manifest.get('format_version')}")
+
+    vectors_path = os.path.join(path, manifest["vectors_file"])
+    if verify and _file_sha256(vectors_path) != manifest["vectors_sha256"]:
+        raise RuntimeError(f"❌ Artifact {version} is corrupted: vector hash mismatch.")
+
+    vectors = np.load(vectors_path, mmap_mode="r")
+    if vectors.shape != (len(manifest["labels"]), manifest["embedding_dim"]):
+        raise RuntimeError(f"❌ Artifact {version} has vectors of shape {vectors.shape}, manifest disagrees.")
+
+    return ArtifactBundle(path, manifest, vectors)
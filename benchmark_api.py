@@ -0,0 +1,211 @@
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmark_report import summarize, run_metadata, write_results, print_table, compare_results
+from memory_stats import process_peak_rss_bytes, format_bytes
+
+# 🔹 Load Test for the API: Concurrent Clients per Scenario, p50/p95/p99, Throughput & Server Peak RSS
+# By default it starts `main:app` on a free localhost port in a separate process (so the load
+# generator does not share the server's GIL); --url targets a server that is already running.
+# --standin serves with the deterministic stand-in encoder (standin_models.py): no model downloads.
+#
+#   python benchmark_api.py --standin --concurrency 1 8 32 --duration 10 --output bench.json
+#   python benchmark_api.py --standin --compare bench.json --fail-on-regression
+
+SCENARIOS = [
+    "predict", "predict_cached", "predict_long", "investors", "semantic", "semantic_long",
+    "chat_send", "chat_history", "inbox",
+]
+
+DESCRIPTION_SUBJECTS = [
+    "An AI platform", "A mobile app", "A blockchain network", "An IoT sensor kit", "A SaaS dashboard",
+    "A marketplace", "A telemedicine service", "A robotics startup", "A payments API", "A learning portal",
+]
+DESCRIPTION_GOALS = [
+    "that helps students learn programming with personalized courses",
+    "for cross-border remittances and digital banking",
+    "that monitors soil moisture and predicts crop yield",
+    "connecting patients with doctors for remote consultations",
+    "that optimizes delivery routes for logistics fleets",
+    "for tracking carbon emissions of manufacturing plants",
+    "that recommends movies and music to streaming users",
+    "helping landlords manage rental properties and tenants",
+    "that detects fraud in insurance claims",
+    "for citizens to access government services online",
+]
+USERS = [f"user{i:03d}" for i in range(200)]
+
+
+def description(rng, unique_id=None):
+    text = f"{rng.choice(DESCRIPTION_SUBJECTS)} {rng.choice(DESCRIPTION_GOALS)}"
+    return f"{text} (variant {unique_id})" if unique_id is not None else text
+
+# 🔹 A Pitch-Deck-Sized Text (~400 words): Past LONG_DESCRIPTION_CHUNK_WORDS, So It Takes the Chunked Path
+def long_description(rng, unique_id):
+    sentences = [f"{description(rng)}." for _ in range(40)]
+    return " ".join(sentences) + f" (variant {unique_id})"
+
+def domain_labels():
+    try:
+        from artifacts import load_artifact_bundle
+        return list(load_artifact_bundle(os.getenv("ARTIFACT_DIR", "artifacts")).labels)
+    except Exception:
+        return ["FinTech", "EdTech", "HealthTech", "AgriTech", "AI & ML"]
+
+# 🔹 One Request for a Scenario: (method, path, json body)
+def make_request(scenario, rng, counter, domains):
+    if scenario == "predict":
+        return "POST", "/predict/", {"description": description(rng, counter)}  # 🔹 Unique text: always a cache miss
+    if scenario == "predict_cached":
+        return "POST", "/predict/", {"description": description(random.Random(counter % 8))}
+    if scenario == "predict_long":
+        return "POST", "/predict/", {"description": long_description(rng, counter)}
+    if scenario == "investors":
+        return "POST", "/investors/", {"selected_domain": rng.choice(domains), "limit": 20}
+    if scenario == "semantic":
+        return "POST", "/investors/semantic", {"description": description(rng, counter), "limit": 10}
+    if scenario == "semantic_long":
+        return "POST", "/investors/semantic", {"description": long_description(rng, counter), "limit": 10, "pooling": "max"}
+    user1, user2 = rng.sample(USERS, 2)
+    if scenario == "chat_send":
+        return "POST", "/chat/", {"sender": user1, "receiver": user2, "message": f"benchmark message {counter}"}
+    if scenario == "chat_history":
+        return "GET", f"/chat/{user1}/{user2}?limit=50", None
+    if scenario == "inbox":
+        return "GET", f"/inbox/{user1}?limit=20", None
+    raise ValueError(f"❌ Unknown scenario: {scenario}")
+
+async def run_scenario(base_url, scenario, concurrency, duration, seed, domains, timeout):
+    latencies, statuses = [], {}
+    deadline = time.perf_counter() + duration
+    counter = iter(range(10 ** 9))
+
+    async def client_loop(client, worker):
+        rng = random.Random(seed * 1000 + worker)
+        while time.perf_counter() < deadline:
+            method, path, body = make_request(scenario, rng, next(counter), domains)
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                status = response.status_code
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(client, worker) for worker in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    result = summarize(latencies, elapsed)
+    result["errors"] = sum(count for status, count in statuses.items() if not (isinstance(status, int) and status < 400))
+    result["status_counts"] = {str(status): count for status, count in sorted(statuses.items(), key=str)}
+    return result
+
+# ✅ Serve main:app on localhost in a Child Process (optionally with the stand-in models)
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_server(args, workdir):
+    port = free_port()
+    env = dict(os.environ)
+    env.setdefault("CHAT_DB_PATH", os.path.join(workdir, "chat.db"))  # 🔹 Never write into the real chat.db
+    env.setdefault("INVESTOR_RELOAD_INTERVAL", "0")
+    command = [sys.executable, __file__, "--serve", "--port", str(port)] + (["--standin"] if args.standin else [])
+    process = subprocess.Popen(command, env=env)
+
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + args.startup_timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"❌ Server exited during startup (code {process.returncode}).")
+        try:
+            if httpx.get(f"{base_url}/readyz", timeout=1).status_code == 200:
+                return process, base_url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise SystemExit("❌ Server did not become ready in time.")
+
+def serve(port, standin):
+    if standin:
+        import standin_models
+        standin_models.install()
+    import uvicorn
+    import main
+    uvicorn.run(main.app, host="127.0.0.1", port=port, log_level="warning")
+
+def main():
+    parser = argparse.ArgumentParser(description="API load test")
+    parser.add_argument("--url", help="Benchmark a running server instead of starting one")
+    parser.add_argument("--server-pid", type=int, help="Pid of the --url server, for its peak RSS (Linux)")
+    parser.add_argument("--standin", action="store_true", help="Serve with the deterministic stand-in encoder")
+    parser.add_argument("--scenarios", nargs="+", default=SCENARIOS, choices=SCENARIOS)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per scenario and concurrency level")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Client timeout per request (seconds)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--startup-timeout", type=float, default=120.0)
+    parser.add_argument("--output", help="Write results as JSON")
+    parser.add_argument("--compare", help="Baseline JSON from an earlier run")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Regression threshold (fraction)")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=8000, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port, args.standin)
+        return
+
+    workdir = tempfile.mkdtemp(prefix="api-bench-")
+    process, server_pid, base_url = None, args.server_pid, args.url
+    if base_url is None:
+        process, base_url = start_server(args, workdir)
+        server_pid = process.pid
+
+    try:
+        domains = domain_labels()
+        benchmarks = {}
+        for scenario in args.scenarios:
+            for concurrency in args.concurrency:
+                name = f"{scenario}@c{concurrency}"
+                benchmarks[name] = asyncio.run(
+                    run_scenario(base_url, scenario, concurrency, args.duration, args.seed, domains, args.timeout)
+                )
+                benchmarks[name]["peak_rss_bytes"] = process_peak_rss_bytes(server_pid) if server_pid else None
+                print(f"✅ {name}: {benchmarks[name].get('count', 0)} requests")
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(10)
+
+    results = {"meta": run_metadata(args), "benchmarks": benchmarks}
+    peak = max((row["peak_rss_bytes"] or 0 for row in benchmarks.values()), default=0)
+    results["server_peak_rss_bytes"] = peak or None
+
+    print_table(benchmarks)
+    print(f"📊 Server peak RSS: {format_bytes(peak) if peak else 'unavailable (pass --server-pid on Linux)'}")
+    if args.output:
+        write_results(results, args.output)
+    if args.compare:
+        regressions = compare_results(results, args.compare, args.threshold)
+        if regressions and args.fail_on_regression:
+            raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import argparse
+import time
+
+import numpy as np
+
+from domain_index import build_domain_index
+
+# 🔹 Recall/Latency Benchmark of the Approximate Domain Index Against the Exact Path
+# Uses synthetic clustered unit vectors shaped like all-MiniLM-L6-v2 embeddings (384-d),
+# so it runs without the SBERT model.
+
+def make_vectors(n, dim, n_clusters, rng):
+    centers = rng.standard_normal((n_clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, n_clusters, n)
+    return centers[labels] + 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+
+def time_search(index, queries, k, batch):
+    start = time.perf_counter()
+    if batch:
+        _, indices = index.search(queries, k)
+    else:
+        indices = np.vstack([index.search(q, k)[1] for q in queries])
+    elapsed = time.perf_counter() - start
+    return indices, elapsed * 1000 / len(queries)
+
+def recall_at_k(approx, exact):
+    hits = sum(len(set(a) & set(e)) for a, e in zip(approx, exact))
+    return hits / exact.size
+
+def main():
+    parser = argparse.ArgumentParser(description="Domain index recall/latency benchmark")
+    parser.add_argument("--domains", type=int, default=50_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--n-probe", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    parser.add_argument("--sklearn", action="store_true", help="Also time sklearn NearestNeighbors(metric='cosine')")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    vectors = make_vectors(args.domains, args.dim, max(1, args.domains // 100), rng)
+    queries = make_vectors(args.queries, args.dim, max(1, args.domains // 100), rng)
+
+    exact = build_domain_index(vectors, "exact")
+    exact_ids, exact_single = time_search(exact, queries, args.k, batch=False)
+    _, exact_batch = time_search(exact, queries, args.k, batch=True)
+    print(f"📊 {args.domains} domains x {args.dim}d, {args.queries} queries, k={args.k}")
+    print(f"exact        recall 1.000  single {exact_single:8.3f} ms/q  batch {exact_batch:8.3f} ms/q")
+
+    if args.sklearn:
+        from sklearn.neighbors import NearestNeighbors
+        knn = NearestNeighbors(n_neighbors=args.k, metric="cosine").fit(vectors)
+        start = time.perf_counter()
+        for q in queries:
+            knn.kneighbors(q.reshape(1, -1), n_neighbors=args.k)
+        sklearn_single = (time.perf_counter() - start) * 1000 / len(queries)
+        print(f"sklearn      recall 1.000  single {sklearn_single:8.3f} ms/q")
+
+    start = time.perf_counter()
+    ivf = build_domain_index(vectors, "ivf")
+    print(f"ivf build    {time.perf_counter() - start:.2f} s, {ivf.n_lists} lists")
+
+    for n_probe in args.n_probe:
+        ivf.n_probe = min(n_probe, ivf.n_lists)
+        ivf_ids, ivf_single = time_search(ivf, queries, args.k, batch=False)
+        _, ivf_batch = time_search(ivf, queries, args.k, batch=True)
+        print(
+            f"ivf probe={ivf.n_probe:<3} recall {recall_at_k(ivf_ids, exact_ids):.3f}  "
+            f"single {ivf_single:8.3f} ms/q  batch {ivf_batch:8.3f} ms/q"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import argparse
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+import pandas as pd
+
+from investor_cache import load_with_cache, load_investor_data
+
+# 🔹 Benchmark: Excel + Cleanup Path vs Parquet Cache Path for the Investor Sheet
+# Uses the server's own cleaning (investor_cache.load_investor_data); --rows enlarges the sheet by repeating it.
+
+def time_runs(fn, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description="Investor sheet load benchmark")
+    parser.add_argument("--source", default="investors_data.xlsx")
+    parser.add_argument("--rows", type=int, default=0, help="Repeat the sheet up to this many rows (0 = as is)")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="investor-bench-")
+    try:
+        source = args.source
+        if args.rows:
+            df = pd.read_excel(args.source)
+            df = pd.concat([df] * (args.rows // len(df) + 1), ignore_index=True).iloc[:args.rows]
+            source = os.path.join(workdir, "investors_data.xlsx")
+            df.to_excel(source, index=False)
+
+        cache_dir = os.path.join(workdir, "cache")
+        xlsx_median, xlsx_best = time_runs(lambda: load_investor_data(source), args.runs)
+
+        load_with_cache(source, load_investor_data, cache_dir)  # 🔹 Build the cache once
+        cached_median, cached_best = time_runs(lambda: load_with_cache(source, load_investor_data, cache_dir), args.runs)
+
+        rows = len(load_with_cache(source, load_investor_data, cache_dir))
+        print(f"📊 {rows} investor rows, {args.runs} runs each")
+        print(f"xlsx + cleanup   median {xlsx_median:9.2f} ms   best {xlsx_best:9.2f} ms")
+        print(f"parquet cache    median {cached_median:9.2f} ms   best {cached_best:9.2f} ms")
+        print(f"speedup          {xlsx_median / cached_median:9.1f}x")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
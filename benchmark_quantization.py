@@ -0,0 +1,121 @@
+import argparse
+import os
+import time
+
+import numpy as np
+
+from artifacts import load_artifact_bundle
+from benchmark_report import run_metadata, write_results
+from domain_index import ExactDomainIndex, normalize_rows, PRECISIONS
+from memory_stats import format_bytes
+
+# 🔹 Memory Saved & Top-k Agreement of float16 / int8 Vector Storage Against float32
+# Runs on the live domain set from the artifact bundle. Queries are descriptions encoded with the
+# bundle's SBERT model (--encode) or, offline, blends of 1-3 domain vectors plus noise. --synthetic N
+# adds N sub-domain-like rows around the real domains to see the numbers at taxonomy/investor scale.
+#
+#   python benchmark_quantization.py --k 3 --rerank 10
+#   python benchmark_quantization.py --synthetic 200000 --output quantization.json
+
+QUERY_TEXTS = [
+    "An AI platform that helps students learn programming with personalized courses",
+    "A mobile app for cross-border remittances and digital banking",
+    "IoT sensors that monitor soil moisture and predict crop yield",
+    "Telemedicine service connecting patients with doctors for remote consultations",
+    "A marketplace that optimizes delivery routes for logistics fleets",
+    "Tracking carbon emissions of manufacturing plants with smart meters",
+    "Streaming platform that recommends movies and music",
+    "Software helping landlords manage rental properties and tenants",
+    "Detecting fraud in insurance claims with machine learning",
+    "A portal for citizens to access government services online",
+    "Decentralized exchange for NFTs and tokenized assets",
+    "Humanoid robots for warehouse automation",
+]
+
+
+def synthetic_queries(vectors, n, rng, noise=0.35):
+    picks = rng.integers(0, len(vectors), (n, 3))
+    weights = rng.dirichlet(np.ones(3), n) * (rng.random((n, 3)) < [1.0, 0.6, 0.3])
+    queries = np.einsum("qc,qcd->qd", weights, np.asarray(vectors)[picks])
+    return normalize_rows(queries + noise * rng.standard_normal(queries.shape).astype(np.float32) / np.sqrt(vectors.shape[1]))
+
+def synthetic_rows(vectors, n, rng, spread=0.5):
+    parents = np.asarray(vectors)[rng.integers(0, len(vectors), n)]
+    return normalize_rows(parents + spread * rng.standard_normal(parents.shape).astype(np.float32) / np.sqrt(vectors.shape[1]) * 4)
+
+# 🔹 batch: micro-batches of 32 queries (PREDICT_BATCH_MAX_SIZE), else one query per call
+def time_per_query(index, queries, k, batch):
+    start = time.perf_counter()
+    if batch:
+        ids = np.vstack([index.search(queries[i:i + 32], k)[1] for i in range(0, len(queries), 32)])
+    else:
+        ids = np.vstack([index.search(query, k)[1] for query in queries])
+    return ids, (time.perf_counter() - start) * 1000 / len(queries)
+
+def agreement(ids, reference):
+    top1 = float(np.mean(ids[:, 0] == reference[:, 0]))
+    overlap = sum(len(set(a) & set(b)) for a, b in zip(ids, reference)) / reference.size
+    return top1, overlap
+
+def main():
+    parser = argparse.ArgumentParser(description="Reduced-precision vector storage report")
+    parser.add_argument("--artifact-dir", default=os.getenv("ARTIFACT_DIR", "artifacts"))
+    parser.add_argument("--encode", action="store_true", help="Encode QUERY_TEXTS with the bundle's SBERT model")
+    parser.add_argument("--queries", type=int, default=1000, help="Synthetic queries (without --encode)")
+    parser.add_argument("--synthetic", type=int, default=0, help="Extra synthetic rows around the real domains")
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--rerank", type=int, default=10, help="Candidates re-scored exactly (besides 0)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write results as JSON")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    bundle = load_artifact_bundle(args.artifact_dir)
+    vectors = normalize_rows(bundle.vectors)
+    if args.synthetic:
+        vectors = np.vstack([vectors, synthetic_rows(vectors, args.synthetic, rng)])
+
+    if args.encode:
+        from sentence_transformers import SentenceTransformer
+        queries = normalize_rows(SentenceTransformer(bundle.model_id).encode(QUERY_TEXTS))
+    else:
+        queries = synthetic_queries(normalize_rows(bundle.vectors), args.queries, rng)
+
+    reference = ExactDomainIndex(vectors, normalized=True)
+    reference_ids, _ = time_per_query(reference, queries, args.k, batch=True)
+    float32_bytes = reference.matrix.nbytes
+    print(f"📊 {len(vectors)} vectors x {vectors.shape[1]}d ({len(bundle.labels)} real domains), "
+          f"{len(queries)} {'encoded' if args.encode else 'synthetic'} queries, k={args.k}")
+    print(f"{'precision':<10} {'rerank':>6} {'bytes':>11} {'saved':>7} {'top-1':>7} {f'top-{args.k}':>7} "
+          f"{'max err':>8} {'single ms/q':>12} {'batch ms/q':>11}")
+
+    rows = []
+    for precision in PRECISIONS:
+        for rerank in sorted({0, args.rerank}) if precision != "float32" else [0]:
+            index = ExactDomainIndex(vectors, normalized=True, precision=precision, rerank=rerank)
+            ids, batch_ms = time_per_query(index, queries, args.k, batch=True)
+            _, single_ms = time_per_query(index, queries[:200], args.k, batch=False)
+            top1, overlap = agreement(ids, reference_ids)
+            error = float(np.abs(index.matrix.dot(queries[:200]) - queries[:200] @ vectors.T).max())
+            row = {
+                "precision": precision,
+                "rerank": rerank,
+                "bytes": index.matrix.nbytes,
+                "saved_fraction": round(1 - index.matrix.nbytes / float32_bytes, 4),
+                "top1_agreement": round(top1, 4),
+                f"top{args.k}_agreement": round(overlap, 4),
+                "max_score_error": round(error, 6),
+                "single_ms_per_query": round(single_ms, 4),
+                "batch_ms_per_query": round(batch_ms, 4),
+            }
+            rows.append(row)
+            print(f"{precision:<10} {rerank:>6} {format_bytes(row['bytes']):>11} {row['saved_fraction']:>7.1%} "
+                  f"{top1:>7.1%} {overlap:>7.1%} {error:>8.5f} {single_ms:>12.4f} {batch_ms:>11.4f}")
+
+    print("🔹 With rerank > 0 the full-precision vectors are still read for the candidates; serve them from "
+          "the memory-mapped artifact (or SHARED_ARRAY_DIR) so only those rows stay resident.")
+    if args.output:
+        write_results({"meta": run_metadata(args), "vectors": int(len(vectors)), "results": rows}, args.output)
+
+if __name__ == "__main__":
+    main()
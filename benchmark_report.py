@@ -0,0 +1,88 @@
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+# 🔹 Shared Helpers for benchmark_api.py & benchmark_stages.py: Latency Summaries,
+# Run Metadata, JSON Results and Regression Comparison Against a Baseline File
+
+def summarize(latencies_ms, elapsed_seconds=None):
+    latencies = np.asarray(latencies_ms, dtype=np.float64)
+    if latencies.size == 0:
+        return {"count": 0}
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    summary = {
+        "count": int(latencies.size),
+        "mean_ms": round(float(latencies.mean()), 3),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "max_ms": round(float(latencies.max()), 3),
+    }
+    if elapsed_seconds:
+        summary["throughput_per_s"] = round(latencies.size / elapsed_seconds, 2)
+    return summary
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def run_metadata(args):
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "git_revision": git_revision(),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "args": {key: value for key, value in vars(args).items() if key not in ("compare", "output")},
+    }
+
+def write_results(results, path):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    print(f"✅ Results written to {path}")
+
+def print_table(rows):
+    print(f"{'benchmark':<34} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'per s':>9}  errors")
+    for name, row in rows.items():
+        if not row.get("count"):
+            print(f"{name:<34} {0:>7}")
+            continue
+        print(f"{name:<34} {row['count']:>7} {row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f} {row['p99_ms']:>9.2f} "
+              f"{row['max_ms']:>9.2f} {row.get('throughput_per_s', 0):>9.1f}  {row.get('errors', 0)}")
+
+# ✅ Compare Against a Previous Results File: p50/p99 Slower or Throughput Lower by More Than
+# `threshold` (a fraction) Counts as a Regression. Returns the list of regressions found.
+def compare_results(current, baseline_path, threshold=0.10):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    regressions = []
+    print(f"📊 Compared with {baseline_path} (revision {baseline.get('meta', {}).get('git_revision')})")
+    for name, row in current["benchmarks"].items():
+        before = baseline.get("benchmarks", {}).get(name)
+        if not before or not before.get("count") or not row.get("count"):
+            continue
+
+        changes = []
+        for metric, higher_is_worse in (("p50_ms", True), ("p99_ms", True), ("throughput_per_s", False)):
+            if metric not in row or not before.get(metric):
+                continue
+            change = (row[metric] - before[metric]) / before[metric]
+            changes.append(f"{metric} {before[metric]:.2f} -> {row[metric]:.2f} ({change:+.0%})")
+            if (change > threshold) if higher_is_worse else (change < -threshold):
+                regressions.append(f"{name}: {metric} {change:+.0%}")
+        print(f"{name:<34} " + ", ".join(changes))
+
+    for regression in regressions:
+        print(f"❌ Regression: {regression}")
+    return regressions
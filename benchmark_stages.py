@@ -0,0 +1,110 @@
+import argparse
+import os
+import time
+
+import numpy as np
+
+from benchmark_api import DESCRIPTION_SUBJECTS, DESCRIPTION_GOALS
+from benchmark_report import summarize, run_metadata, write_results, print_table, compare_results
+from memory_stats import peak_rss_bytes, format_bytes
+
+# 🔹 Micro-Benchmarks of Each Prediction & Ranking Stage in Isolation (in-process, no HTTP)
+# keyword extraction, encoding, domain neighbor search, and investor ranking (domain page,
+# semantic search), each at batch size 1 and --batch-size so batching gains are visible.
+#
+#   python benchmark_stages.py --standin --iterations 200 --output stages.json
+
+
+def time_calls(fn, iterations, items_per_call=1):
+    fn()  # 🔹 Warm-up call, not measured
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        call_start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - call_start) * 1000)
+    result = summarize(latencies, time.perf_counter() - start)
+    if items_per_call > 1 and "throughput_per_s" in result:
+        result["items_per_s"] = round(result["throughput_per_s"] * items_per_call, 2)
+    return result
+
+def load_app(standin):
+    if standin:
+        import standin_models
+        standin_models.install()
+    os.environ.setdefault("CHAT_STORE_BACKEND", "memory")
+    os.environ.setdefault("INVESTOR_RELOAD_INTERVAL", "0")
+    os.environ.setdefault("WARMUP_ITERATIONS", "0")
+    import main
+    main.load_resources()
+    if main.load_status["error"]:
+        raise SystemExit(f"❌ Could not load models: {main.load_status['error']}")
+    return main
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage micro-benchmarks")
+    parser.add_argument("--standin", action="store_true", help="Use the deterministic stand-in encoder")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--output", help="Write results as JSON")
+    parser.add_argument("--compare", help="Baseline JSON from an earlier run")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Regression threshold (fraction)")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    app = load_app(args.standin)
+    descriptions = [f"{s} {g}" for s in DESCRIPTION_SUBJECTS for g in DESCRIPTION_GOALS]
+    batch = (descriptions * (args.batch_size // len(descriptions) + 1))[:args.batch_size]
+    keyword_texts, doc_embeddings = app.extract_keywords_batch(batch)
+    query_vectors = app.sbert_model.encode(keyword_texts)
+    snapshot = app.investor_store.snapshot
+    domains = list(app.domain_labels)
+    n = args.iterations
+
+    benchmarks = {
+        "keywords@b1": time_calls(lambda: app.extract_keywords_batch(batch[:1]), n),
+        f"keywords@b{len(batch)}": time_calls(lambda: app.extract_keywords_batch(batch), n, len(batch)),
+        "encode@b1": time_calls(lambda: app.sbert_model.encode(keyword_texts[:1]), n),
+        f"encode@b{len(batch)}": time_calls(lambda: app.sbert_model.encode(keyword_texts), n, len(batch)),
+        "neighbors@b1": time_calls(lambda: app.domain_index.search(query_vectors[:1], k=3), n),
+        f"neighbors@b{len(batch)}": time_calls(lambda: app.domain_index.search(query_vectors, k=3), n, len(batch)),
+        "investors_page": time_calls(lambda: [snapshot.index.page(d, 0, 20) for d in domains], n, len(domains)),
+    }
+    if snapshot.semantic is not None:
+        benchmarks["investors_semantic"] = time_calls(
+            lambda: snapshot.semantic.search(query_vectors[0], 10, app.INVESTOR_SEMANTIC_WEIGHT), n
+        )
+    benchmarks["predict_end_to_end@b1"] = time_calls(
+        lambda: app.compute_prediction(batch[0], app.CLASSIFICATION_MODE), n
+    )
+
+    # 🔹 Long Descriptions (chunked & pooled): Latency Should Stay Flat Past the Chunk Budget
+    words = " ".join(descriptions).split()
+    for size in (500, 5000):
+        long_text = " ".join(words[i % len(words)] for i in range(size))
+        benchmarks[f"predict_long@{size}w"] = time_calls(
+            lambda: app.compute_prediction(long_text, app.CLASSIFICATION_MODE), max(1, n // 10)
+        )
+
+    results = {
+        "meta": run_metadata(args),
+        "benchmarks": benchmarks,
+        "context": {
+            "investor_rows": snapshot.rows,
+            "domains": len(domains),
+            "embedding_dim": int(np.asarray(query_vectors).shape[1]),
+        },
+        "peak_rss_bytes": peak_rss_bytes(),
+    }
+
+    print_table(benchmarks)
+    print(f"📊 Peak RSS: {format_bytes(results['peak_rss_bytes'])}")
+    if args.output:
+        write_results(results, args.output)
+    if args.compare:
+        regressions = compare_results(results, args.compare, args.threshold)
+        if regressions and args.fail_on_regression:
+            raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
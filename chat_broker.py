@@ -0,0 +1,112 @@
+import asyncio
+import threading
+from collections import defaultdict, deque
+
+
+# ✅ One Subscriber (a WebSocket or a waiting long-poll) with a Bounded Queue
+class ChatSubscription:
+    def __init__(self, conversation, queue_size):
+        self.conversation = conversation
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False  # 🔹 Set when messages were dropped; the reader resyncs from the store
+
+    async def wait(self, timeout=None):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+# ✅ In-Process Fan-Out of New Chat Messages to Subscribers of Each Conversation
+# Idle subscribers cost one small queue and no CPU; publishers never block on slow readers.
+# A message is published by the request that stored it and again by ChatStoreWatcher; the
+# recently published ids make the second call a no-op.
+class ChatBroker:
+    def __init__(self, queue_size=64, recent_ids=4096):
+        self.queue_size = queue_size
+        self._subscribers = defaultdict(set)
+        self._loop = None
+        self._recent = deque(maxlen=recent_ids)
+        self._recent_set = set()
+        self._recent_lock = threading.Lock()
+
+    def bind(self, loop):
+        self._loop = loop
+
+    def subscribe(self, conversation):
+        subscription = ChatSubscription(conversation, self.queue_size)
+        self._subscribers[conversation].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        subscribers = self._subscribers.get(subscription.conversation)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.conversation]
+
+    def subscriber_count(self):
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    # 🔹 Thread-Safe: Called from Sync Endpoints Running in the Threadpool
+    def publish(self, conversation, record):
+        with self._recent_lock:
+            if record["id"] in self._recent_set:
+                return
+            if len(self._recent) == self._recent.maxlen:
+                self._recent_set.discard(self._recent[0])
+            self._recent.append(record["id"])
+            self._recent_set.add(record["id"])
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._fanout, conversation, record)
+
+    def _fanout(self, conversation, record):
+        for subscription in list(self._subscribers.get(conversation, ())):
+            try:
+                subscription.queue.put_nowait(record)
+            except asyncio.QueueFull:
+                # 🔹 Drop the Backlog (memory stays bounded) and Let the Reader Catch Up from the Store
+                while not subscription.queue.empty():
+                    subscription.queue.get_nowait()
+                subscription.overflowed = True
+                subscription.queue.put_nowait(record)
+
+
+# ✅ Cross-Worker Delivery: One Thread per Worker Reads Messages Newer Than Its High-Water Id
+# from the Shared Store Each Interval and Publishes Them Locally, so Subscribers Only Wait on
+# Their Queues. Cost is one primary-key range query per interval, however many clients wait.
+class ChatStoreWatcher:
+    def __init__(self, store, broker, interval_seconds=1.0, page_size=500):
+        self.store = store
+        self.broker = broker
+        self.interval_seconds = interval_seconds
+        self.page_size = page_size
+        self.last_id = 0
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        if self.interval_seconds <= 0 or self._thread is not None:
+            return
+        self.last_id = self.store.last_message_id()
+        self._thread = threading.Thread(target=self._watch, name="chat-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _watch(self):
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"❌ Chat watcher failed: {e}")
+
+    def poll(self):
+        while True:
+            changes = self.store.changes_since(self.last_id, self.page_size)
+            for conversation, record in changes:
+                self.broker.publish(conversation, record)
+                self.last_id = record["id"]
+            if len(changes) < self.page_size:
+                return
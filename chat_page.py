@@ -39,25 +39,35 @@ message_input = st.text_input("Type a message...")
 
 if st.button("Send"):
     if message_input.strip():
-        # Send message to backend
+        # Send message to backend (it is delivered back to us by the long-poll below)
         response = requests.post(f"{BACKEND_URL}/chat/", json={
             "sender": username,
             "receiver": investor_name,
             "message": message_input.strip()
         })
         
-        if response.status_code == 200:
-            st.session_state["chat_history"].append({"sender": username, "message": message_input.strip()})
-            messages.append(f"*You:* {message_input.strip()}")
-            chat_box.markdown("\n".join(messages))
-        else:
+        if response.status_code != 200:
             st.error("Failed to send message. Try again!")
 
-# Auto-refresh chat every 5 seconds
+# Wait for new messages: the server holds each request until a message arrives (or ~25s pass)
 while True:
-    time.sleep(5)
-    new_chat = fetch_chat()
-    if new_chat != st.session_state["chat_history"]:
-        st.session_state["chat_history"] = new_chat
-        messages = [f"{msg['sender']}:** {msg['message']}" for msg in new_chat]
+    last_id = st.session_state["chat_history"][-1].get("id", 0) if st.session_state["chat_history"] else 0
+    try:
+        response = requests.get(
+            f"{BACKEND_URL}/chat/{username}/{investor_name}/poll",
+            params={"since": last_id, "timeout": 25},
+            timeout=30
+        )
+    except requests.exceptions.RequestException:
+        time.sleep(5)  # Backend unreachable: back off before retrying
+        continue
+
+    if response.status_code != 200:
+        time.sleep(5)
+        continue
+
+    new_messages = response.json()["chat_history"]
+    if new_messages:
+        st.session_state["chat_history"].extend(new_messages)
+        messages = [f"{msg['sender']}:** {msg['message']}" for msg in st.session_state["chat_history"]]
         chat_box.markdown("\n".join(messages))
\ No newline at end of file
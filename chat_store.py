@@ -0,0 +1,438 @@
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+
+
+# 🔹 Both Participants Map to the Same Conversation, Whatever the Direction
+# The length prefix keeps ids unambiguous ("ab" + "c" and "a" + "bc" no longer collide).
+def conversation_key(user1, user2):
+    first, second = sorted((user1, user2))
+    return f"{len(first)}:{first}:{second}"
+
+
+# ✅ Chat Storage Interface: Append-Only Messages Grouped by Conversation,
+# plus a Participant -> Conversations Index (last message, unread count) for Inboxes
+class ChatStore(ABC):
+    def __init__(self, max_messages_per_conversation=1000, retention_seconds=90 * 24 * 3600, compact_every=1000):
+        self.max_messages_per_conversation = max_messages_per_conversation
+        self.retention_seconds = retention_seconds
+        self.compact_every = compact_every
+        self._appends = 0
+        self._appends_lock = threading.Lock()
+
+    def append(self, sender, receiver, message):
+        record = self._append(conversation_key(sender, receiver), sender, receiver, message, time.time())
+
+        # 🔹 Age-Based Retention Runs Every `compact_every` Appends
+        with self._appends_lock:
+            self._appends += 1
+            due = self.compact_every > 0 and self._appends % self.compact_every == 0
+        if due:
+            self.compact()
+        return record
+
+    # 🔹 Messages in Id Order, Optionally Only Those After `after_id` (at most `limit`)
+    def history(self, user1, user2, after_id=None, limit=None):
+        return self._history(conversation_key(user1, user2), after_id or 0, limit)
+
+    # 🔹 Cheap Validator Data: {"first_id", "last_id", "last_created_at"} (ids are 0 for an empty chat)
+    def state(self, user1, user2):
+        return self._state(conversation_key(user1, user2))
+
+    # 🔹 A User's Conversations, Most Recent First, with Last Message & Unread Count
+    def inbox(self, user, limit=50):
+        return self._inbox(user, limit)
+
+    # 🔹 Mark Messages from `other_user` as Read up to `up_to_id` (default: all); returns the unread count left
+    def mark_read(self, user, other_user, up_to_id=None):
+        return self._mark_read(user, conversation_key(user, other_user), up_to_id)
+
+    # 🔹 Messages of Every Conversation After `after_id`, as (conversation, record) in Id Order
+    # (read by ChatStoreWatcher to pick up messages other workers stored)
+    def changes_since(self, after_id, limit=500):
+        return self._changes_since(after_id, limit)
+
+    # 🔹 Highest Message Id Stored So Far (0 when empty)
+    def last_message_id(self):
+        return self._last_message_id()
+
+    @abstractmethod
+    def _append(self, conversation, sender, receiver, message, created_at):
+        raise NotImplementedError
+
+    @abstractmethod
+    def _state(self, conversation):
+        raise NotImplementedError
+
+    @abstractmethod
+    def _history(self, conversation, after_id, limit):
+        raise NotImplementedError
+
+    @abstractmethod
+    def _inbox(self, user, limit):
+        raise NotImplementedError
+
+    @abstractmethod
+    def _mark_read(self, user, conversation, up_to_id):
+        raise NotImplementedError
+
+    @abstractmethod
+    def _changes_since(self, after_id, limit):
+        raise NotImplementedError
+
+    @abstractmethod
+    def _last_message_id(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def compact(self):
+        raise NotImplementedError
+
+
+def inbox_entry(conversation, other_user, last_message, unread_count):
+    return {
+        "conversation_id": conversation,
+        "other_user": other_user,
+        "last_message": last_message,
+        "unread_count": unread_count,
+    }
+
+
+# ✅ In-Memory Store (single-process development; nothing persists or is shared between workers)
+class InMemoryChatStore(ChatStore):
+    def __init__(self, **retention):
+        super().__init__(**retention)
+        self._conversations = {}
+        self._participants = {}  # 🔹 user -> {conversation: {"other_user", "last_read_id", "unread_count"}}
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def _append(self, conversation, sender, receiver, message, created_at):
+        with self._lock:
+            record = {"id": self._next_id, "sender": sender, "message": message, "created_at": created_at}
+            self._next_id += 1
+            if conversation not in self._conversations:
+                self._conversations[conversation] = deque(maxlen=self.max_messages_per_conversation or None)
+            self._conversations[conversation].append(record)
+
+            # 🔹 Receiver Gains One Unread Message (never more than the deque still holds after a trim);
+            # the Sender Has Read Up to Their Own Message
+            if receiver != sender:
+                entry = self._participant(receiver, conversation, sender)
+                entry["unread_count"] = min(entry["unread_count"] + 1, len(self._conversations[conversation]))
+            entry = self._participant(sender, conversation, receiver)
+            entry["last_read_id"], entry["unread_count"] = record["id"], 0
+            return record
+
+    def _participant(self, user, conversation, other_user):
+        return self._participants.setdefault(user, {}).setdefault(
+            conversation, {"other_user": other_user, "last_read_id": 0, "unread_count": 0}
+        )
+
+    def _history(self, conversation, after_id, limit):
+        with self._lock:
+            messages = [m for m in self._conversations.get(conversation, ()) if m["id"] > after_id]
+        return messages[:limit] if limit else messages
+
+    def _changes_since(self, after_id, limit):
+        with self._lock:
+            changes = [
+                (conversation, m) for conversation, messages in self._conversations.items() for m in messages if m["id"] > after_id
+            ]
+        changes.sort(key=lambda change: change[1]["id"])
+        return changes[:limit]
+
+    def _last_message_id(self):
+        with self._lock:
+            return self._next_id - 1
+
+    def _state(self, conversation):
+        with self._lock:
+            messages = self._conversations.get(conversation)
+            if not messages:
+                return {"first_id": 0, "last_id": 0, "last_created_at": None}
+            return {"first_id": messages[0]["id"], "last_id": messages[-1]["id"], "last_created_at": messages[-1]["created_at"]}
+
+    def _inbox(self, user, limit):
+        with self._lock:
+            entries = [
+                inbox_entry(conversation, entry["other_user"], self._conversations[conversation][-1], entry["unread_count"])
+                for conversation, entry in self._participants.get(user, {}).items()
+            ]
+        entries.sort(key=lambda e: e["last_message"]["id"], reverse=True)
+        return entries[:limit]
+
+    def _mark_read(self, user, conversation, up_to_id):
+        with self._lock:
+            entry = self._participants.get(user, {}).get(conversation)
+            if entry is None:
+                return 0
+            last_id = self._conversations[conversation][-1]["id"]
+            entry["last_read_id"] = max(entry["last_read_id"], min(up_to_id or last_id, last_id))
+            entry["unread_count"] = sum(
+                1 for m in self._conversations[conversation] if m["id"] > entry["last_read_id"] and m["sender"] != user
+            )
+            return entry["unread_count"]
+
+    def compact(self):
+        cutoff = time.time() - self.retention_seconds
+        with self._lock:
+            for conversation, messages in list(self._conversations.items()):
+                while messages and messages[0]["created_at"] < cutoff:
+                    messages.popleft()
+                if not messages:
+                    del self._conversations[conversation]
+                    for entries in self._participants.values():
+                        entries.pop(conversation, None)
+                    continue
+                # 🔹 Unread Messages Are the Newest Ones, so Dropping Old Ones Only Caps the Count
+                for entries in self._participants.values():
+                    entry = entries.get(conversation)
+                    if entry is not None:
+                        entry["unread_count"] = min(entry["unread_count"], len(messages))
+
+
+# ✅ SQLite Store in WAL Mode: Shared by All Workers on the Host and Kept Across Restarts
+class SQLiteChatStore(ChatStore):
+    SCHEMA_VERSION = 2
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            conversation TEXT NOT NULL,
+            sender TEXT NOT NULL,
+            receiver TEXT NOT NULL,
+            message TEXT NOT NULL,
+            created_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_messages_conversation ON messages (conversation, id);
+        CREATE INDEX IF NOT EXISTS idx_messages_created_at ON messages (created_at);
+
+        -- One row per conversation with its latest message
+        CREATE TABLE IF NOT EXISTS conversations (
+            id TEXT PRIMARY KEY,
+            last_message_id INTEGER NOT NULL,
+            last_sender TEXT NOT NULL,
+            last_message TEXT NOT NULL,
+            last_created_at REAL NOT NULL
+        );
+
+        -- Secondary index: participant -> their conversations, with read position and unread count
+        CREATE TABLE IF NOT EXISTS participants (
+            user TEXT NOT NULL,
+            conversation TEXT NOT NULL,
+            other_user TEXT NOT NULL,
+            last_read_id INTEGER NOT NULL DEFAULT 0,
+            unread_count INTEGER NOT NULL DEFAULT 0,
+            last_message_id INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user, conversation)
+        );
+        CREATE INDEX IF NOT EXISTS idx_participants_recent ON participants (user, last_message_id DESC);
+    """
+
+    def __init__(self, path, **retention):
+        super().__init__(**retention)
+        self.path = path
+        self._local = threading.local()
+        conn = self._connection()
+        with conn:
+            conn.executescript(self.SCHEMA)
+        self._migrate(conn)
+
+        # 🔹 SQLite Connections Must Not Cross a Fork (preloaded servers): Children Open Their Own
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._forget_connections)
+
+    def _forget_connections(self):
+        self._local = threading.local()
+
+    # 🔹 One Connection per Thread (WAL lets readers run alongside the writer)
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # 🔹 Schema v1 Keyed Conversations by Bare Concatenation: Re-Key Them and Backfill the Inbox Index
+    # Existing history is treated as read.
+    def _migrate(self, conn):
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= self.SCHEMA_VERSION:
+            return
+
+        conn.create_function("conversation_key", 2, conversation_key, deterministic=True)
+        with conn:
+            conn.execute("UPDATE messages SET conversation = conversation_key(sender, receiver)")
+            conn.execute("DELETE FROM conversations")
+            conn.execute("DELETE FROM participants")
+            conn.execute("""
+                INSERT INTO conversations (id, last_message_id, last_sender, last_message, last_created_at)
+                SELECT conversation, id, sender, message, created_at FROM messages
+                WHERE id IN (SELECT MAX(id) FROM messages GROUP BY conversation)
+            """)
+            conn.execute("""
+                INSERT OR IGNORE INTO participants (user, conversation, other_user, last_read_id, last_message_id)
+                SELECT m.sender, m.conversation, m.receiver, c.last_message_id, c.last_message_id
+                FROM messages m JOIN conversations c ON c.id = m.conversation
+                UNION ALL
+                SELECT m.receiver, m.conversation, m.sender, c.last_message_id, c.last_message_id
+                FROM messages m JOIN conversations c ON c.id = m.conversation
+            """)
+            conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+
+    def _append(self, conversation, sender, receiver, message, created_at):
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute(
+                "INSERT INTO messages (conversation, sender, receiver, message, created_at) VALUES (?, ?, ?, ?, ?)",
+                (conversation, sender, receiver, message, created_at)
+            )
+            message_id = cursor.lastrowid
+
+            # 🔹 Inbox Index Updated in the Same Transaction as the Message
+            conn.execute(
+                """INSERT INTO conversations (id, last_message_id, last_sender, last_message, last_created_at)
+                   VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT (id) DO UPDATE SET last_message_id = excluded.last_message_id,
+                       last_sender = excluded.last_sender, last_message = excluded.last_message,
+                       last_created_at = excluded.last_created_at""",
+                (conversation, message_id, sender, message, created_at)
+            )
+            if receiver != sender:
+                # 🔹 Unread Messages Are the Newest Ones, so the Trim Below Leaves at Most N of Them
+                conn.execute(
+                    """INSERT INTO participants (user, conversation, other_user, unread_count, last_message_id)
+                       VALUES (?, ?, ?, 1, ?)
+                       ON CONFLICT (user, conversation) DO UPDATE SET
+                           unread_count = MIN(unread_count + 1, COALESCE(?, unread_count + 1)),
+                           last_message_id = excluded.last_message_id""",
+                    (receiver, conversation, sender, message_id, self.max_messages_per_conversation or None)
+                )
+            conn.execute(
+                """INSERT INTO participants (user, conversation, other_user, last_read_id, unread_count, last_message_id)
+                   VALUES (?, ?, ?, ?, 0, ?)
+                   ON CONFLICT (user, conversation) DO UPDATE SET
+                       last_read_id = excluded.last_read_id, unread_count = 0,
+                       last_message_id = excluded.last_message_id""",
+                (sender, conversation, receiver, message_id, message_id)
+            )
+
+            # 🔹 Trim This Conversation to the Newest N Messages (index range delete)
+            if self.max_messages_per_conversation:
+                conn.execute(
+                    """DELETE FROM messages WHERE conversation = ? AND id <= (
+                           SELECT id FROM messages WHERE conversation = ? ORDER BY id DESC LIMIT 1 OFFSET ?
+                       )""",
+                    (conversation, conversation, self.max_messages_per_conversation)
+                )
+        return {"id": message_id, "sender": sender, "message": message, "created_at": created_at}
+
+    def _history(self, conversation, after_id, limit):
+        rows = self._connection().execute(
+            "SELECT id, sender, message, created_at FROM messages WHERE conversation = ? AND id > ? ORDER BY id LIMIT ?",
+            (conversation, after_id, limit or -1)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def _changes_since(self, after_id, limit):
+        # 🔹 Primary-Key Range Scan: Costs Only the New Rows
+        rows = self._connection().execute(
+            "SELECT id, conversation, sender, message, created_at FROM messages WHERE id > ? ORDER BY id LIMIT ?",
+            (after_id, limit or -1)
+        ).fetchall()
+        return [(row["conversation"], {key: row[key] for key in ("id", "sender", "message", "created_at")}) for row in rows]
+
+    def _last_message_id(self):
+        return self._connection().execute("SELECT COALESCE(MAX(id), 0) FROM messages").fetchone()[0]
+
+    def _state(self, conversation):
+        # 🔹 Two Index Seeks on (conversation, id), Independent of History Length
+        conn = self._connection()
+        first = conn.execute(
+            "SELECT id FROM messages WHERE conversation = ? ORDER BY id LIMIT 1", (conversation,)
+        ).fetchone()
+        last = conn.execute(
+            "SELECT id, created_at FROM messages WHERE conversation = ? ORDER BY id DESC LIMIT 1", (conversation,)
+        ).fetchone()
+        if last is None:
+            return {"first_id": 0, "last_id": 0, "last_created_at": None}
+        return {"first_id": first["id"], "last_id": last["id"], "last_created_at": last["created_at"]}
+
+    def _inbox(self, user, limit):
+        # 🔹 Range Scan over This User's Participant Rows Only, plus One Primary-Key Lookup Each
+        rows = self._connection().execute(
+            """SELECT p.conversation, p.other_user, p.unread_count,
+                      c.last_message_id, c.last_sender, c.last_message, c.last_created_at
+               FROM participants p JOIN conversations c ON c.id = p.conversation
+               WHERE p.user = ? ORDER BY p.last_message_id DESC LIMIT ?""",
+            (user, limit)
+        ).fetchall()
+        return [
+            inbox_entry(
+                row["conversation"],
+                row["other_user"],
+                {
+                    "id": row["last_message_id"],
+                    "sender": row["last_sender"],
+                    "message": row["last_message"],
+                    "created_at": row["last_created_at"],
+                },
+                row["unread_count"],
+            )
+            for row in rows
+        ]
+
+    def _mark_read(self, user, conversation, up_to_id):
+        conn = self._connection()
+        with conn:
+            entry = conn.execute(
+                "SELECT last_read_id, last_message_id FROM participants WHERE user = ? AND conversation = ?",
+                (user, conversation)
+            ).fetchone()
+            if entry is None:
+                return 0
+
+            last_id = entry["last_message_id"]
+            last_read_id = max(entry["last_read_id"], min(up_to_id or last_id, last_id))
+            # 🔹 Counts Only the Messages Still Unread (range on (conversation, id))
+            unread = conn.execute(
+                "SELECT COUNT(*) FROM messages WHERE conversation = ? AND id > ? AND sender != ?",
+                (conversation, last_read_id, user)
+            ).fetchone()[0]
+            conn.execute(
+                "UPDATE participants SET last_read_id = ?, unread_count = ? WHERE user = ? AND conversation = ?",
+                (last_read_id, unread, user, conversation)
+            )
+        return unread
+
+    def compact(self):
+        conn = self._connection()
+        cutoff = time.time() - self.retention_seconds
+        with conn:
+            conn.execute("DELETE FROM messages WHERE created_at < ?", (cutoff,))
+            # 🔹 Recount Unread Messages Where Expired Ones Were Dropped (as _mark_read does)
+            conn.execute(
+                """UPDATE participants SET unread_count = (
+                       SELECT COUNT(*) FROM messages m WHERE m.conversation = participants.conversation
+                           AND m.id > participants.last_read_id AND m.sender != participants.user
+                   ) WHERE unread_count > 0"""
+            )
+            conn.execute(
+                "DELETE FROM participants WHERE conversation IN (SELECT id FROM conversations WHERE last_created_at < ?)",
+                (cutoff,)
+            )
+            conn.execute("DELETE FROM conversations WHERE last_created_at < ?", (cutoff,))
+        conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+
+def create_chat_store(backend, path, **retention):
+    if backend == "memory":
+        return InMemoryChatStore(**retention)
+    if backend == "sqlite":
+        return SQLiteChatStore(path, **retention)
+    raise ValueError(f"❌ Unknown chat store backend: {backend}. Use 'sqlite' or 'memory'.")
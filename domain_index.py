@@ -0,0 +1,205 @@
+import numpy as np
+
+
+# 🔹 L2-Normalize Rows (zero rows stay zero)
+def normalize_rows(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors.reshape(1, -1)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+# 🔹 Top-k Columns per Row of a Similarity Matrix (argpartition, then sort only k items)
+def top_k(similarities, k):
+    k = min(k, similarities.shape[1])
+    if k < similarities.shape[1]:
+        candidates = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.broadcast_to(np.arange(similarities.shape[1]), similarities.shape)
+
+    candidate_scores = np.take_along_axis(similarities, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1, kind="stable")
+    return np.take_along_axis(candidates, order, axis=1), np.take_along_axis(candidate_scores, order, axis=1)
+
+
+# 🔹 Reduced-Precision Storage for Embedding Matrices: "float32" (as is), "float16" (half the bytes)
+# or "int8" (a quarter, plus one float32 scale per row: row ~= codes * scale).
+# Scoring reads the compact codes in cache-sized blocks of `block_rows`, widening one block at a time
+# to float32 for the BLAS product and applying the int8 row scales to the scores afterwards, so no
+# full-precision copy of the matrix is ever materialized. int8 scores about as fast as float32 at a
+# quarter of the memory; numpy's float16 -> float32 conversion is slow, so float16 costs ~4x the time.
+
+PRECISIONS = ("float32", "float16", "int8")
+SCORE_BLOCK_ROWS = 256
+
+
+class QuantizedMatrix:
+    def __init__(self, vectors, precision="float32", block_rows=SCORE_BLOCK_ROWS):
+        if precision not in PRECISIONS:
+            raise ValueError(f"❌ Unknown vector precision: {precision}. Use one of {list(PRECISIONS)}.")
+        self.precision = precision
+        self.block_rows = block_rows
+        self.scales = None
+
+        if precision == "float32":
+            self.codes = np.asarray(vectors, dtype=np.float32)  # 🔹 A float32 memory map is kept as is
+        elif precision == "float16":
+            self.codes = np.asarray(vectors, dtype=np.float32).astype(np.float16)
+        else:
+            vectors = np.asarray(vectors, dtype=np.float32)
+            scales = np.abs(vectors).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            self.codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+            self.scales = scales.astype(np.float32)
+
+    @property
+    def shape(self):
+        return self.codes.shape
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    # 🔹 queries (n_queries, dim) float32 @ rows.T -> (n_queries, n_rows); `rows` selects a subset
+    def dot(self, queries, rows=None):
+        codes = self.codes if rows is None else self.codes[rows]
+        if self.precision == "float32":
+            return queries @ codes.T
+
+        scores = np.empty((queries.shape[0], codes.shape[0]), dtype=np.float32)
+        for start in range(0, codes.shape[0], self.block_rows):
+            block = codes[start:start + self.block_rows].astype(np.float32)
+            scores[:, start:start + block.shape[0]] = queries @ block.T
+        if self.scales is not None:
+            scores *= self.scales if rows is None else self.scales[rows]
+        return scores
+
+    # 🔹 Dequantized float32 Rows
+    def rows(self, ids):
+        rows = self.codes[ids].astype(np.float32)
+        if self.scales is not None:
+            rows *= self.scales[ids][..., None]
+        return rows
+
+
+# ✅ Re-Score Candidate Rows Against Full-Precision Vectors and Keep the Best k
+# candidates: (n_queries, n_candidates) row ids from the approximate pass (-1 = none).
+# Returns (row ids, exact cosine similarities), each (n_queries, k), best first.
+def rerank_exact(queries, candidates, vectors, k):
+    valid = candidates >= 0
+    rows = np.asarray(vectors[np.where(valid, candidates, 0)], dtype=np.float32)
+    exact = np.einsum("qd,qcd->qc", queries, rows)
+    exact[~valid] = -np.inf
+    order, scores = top_k(exact, k)
+    return np.take_along_axis(candidates, order, axis=1), scores
+
+
+# ✅ Exact Cosine Index: One Matrix Product + argpartition
+# With precision "float16"/"int8" the product runs on the compact copy; `rerank` > 0 then re-scores
+# that many best candidates against the full-precision vectors (a memory map only pages those rows in).
+class ExactDomainIndex:
+    def __init__(self, vectors, normalized=False, precision="float32", rerank=0):
+        # 🔹 Pre-normalized vectors (e.g. a memory-mapped artifact) are used in place, without a copy
+        vectors = np.asarray(vectors, dtype=np.float32) if normalized else normalize_rows(vectors)
+        self.matrix = QuantizedMatrix(vectors, precision)
+        self.rerank = rerank if precision != "float32" else 0
+        self.vectors = vectors if precision == "float32" or self.rerank else None
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    @property
+    def dim(self):
+        return self.matrix.shape[1]
+
+    # 🔹 Returns (cosine distances, indices) shaped (n_queries, k), like NearestNeighbors.kneighbors
+    def search(self, queries, k=3):
+        queries = normalize_rows(queries)
+        similarities = self.matrix.dot(queries)
+        if not self.rerank:
+            indices, scores = top_k(similarities, k)
+        else:
+            candidates = top_k(similarities, max(k, self.rerank))[0]
+            indices, scores = rerank_exact(queries, candidates, self.vectors, k)
+        return 1.0 - scores, indices
+
+
+# ✅ Approximate IVF Index: Spherical k-means Buckets, Exact Scoring Inside the Probed Buckets
+class IVFDomainIndex:
+    def __init__(self, vectors, n_lists=None, n_probe=8, n_iter=10, seed=0, normalized=False, precision="float32", rerank=0):
+        self.vectors = np.asarray(vectors, dtype=np.float32) if normalized else normalize_rows(vectors)
+        n = self.vectors.shape[0]
+        self.n_lists = max(1, min(n, n_lists or int(np.sqrt(n))))
+        self.n_probe = max(1, min(n_probe, self.n_lists))
+
+        self.centroids = self._train(n_iter, np.random.default_rng(seed))
+        assignments = np.argmax(self.vectors @ self.centroids.T, axis=1)
+
+        # 🔹 Inverted Lists: Row Ids Grouped by Bucket
+        order = np.argsort(assignments, kind="stable")
+        bounds = np.searchsorted(assignments[order], np.arange(self.n_lists + 1))
+        self.lists = [order[bounds[i]:bounds[i + 1]] for i in range(self.n_lists)]
+
+        # 🔹 Candidates Are Scored on the (optionally reduced-precision) Copy, Like ExactDomainIndex
+        self.matrix = QuantizedMatrix(self.vectors, precision)
+        self.rerank = rerank if precision != "float32" else 0
+        if precision != "float32" and not self.rerank:
+            self.vectors = None
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    @property
+    def dim(self):
+        return self.matrix.shape[1]
+
+    def _train(self, n_iter, rng):
+        n = self.vectors.shape[0]
+        centroids = self.vectors[rng.choice(n, self.n_lists, replace=False)].copy()
+
+        for _ in range(n_iter):
+            assignments = np.argmax(self.vectors @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, self.vectors)
+
+            # 🔹 Re-seed Empty Buckets from Random Rows
+            empty = np.bincount(assignments, minlength=self.n_lists) == 0
+            if empty.any():
+                sums[empty] = self.vectors[rng.choice(n, int(empty.sum()), replace=False)]
+
+            centroids = normalize_rows(sums)
+
+        return centroids
+
+    def search(self, queries, k=3):
+        queries = normalize_rows(queries)
+        k = min(k, len(self))
+        probes = top_k(queries @ self.centroids.T, self.n_probe)[0]
+
+        distances = np.full((queries.shape[0], k), np.inf, dtype=np.float32)
+        indices = np.full((queries.shape[0], k), -1, dtype=np.int64)
+
+        for row, query in enumerate(queries):
+            candidates = np.concatenate([self.lists[p] for p in probes[row]])
+            if candidates.size == 0:
+                continue
+            found, scores = top_k(self.matrix.dot(query.reshape(1, -1), candidates), max(k, self.rerank))
+            found = candidates[found]
+            if self.rerank:
+                found, scores = rerank_exact(query.reshape(1, -1), found, self.vectors, k)
+            distances[row, :found.shape[1]] = 1.0 - scores[0]
+            indices[row, :found.shape[1]] = found[0]
+
+        return distances, indices
+
+
+# ✅ Available Index Backends
+INDEX_BACKENDS = {
+    "exact": ExactDomainIndex,
+    "ivf": IVFDomainIndex,
+}
+
+def build_domain_index(vectors, backend="exact", **options):
+    if backend not in INDEX_BACKENDS:
+        raise ValueError(f"❌ Unknown domain index backend: {backend}. Use one of {list(INDEX_BACKENDS)}.")
+    return INDEX_BACKENDS[backend](vectors, **options)
@@ -0,0 +1,71 @@
+import csv
+import json
+import os
+
+# 🔹 Domain Taxonomy File: Label -> Description Text That Gets Embedded (read by ml_model.py)
+# Accepted layouts, picked by file extension:
+#   .json / .yaml / .yml   {"FinTech": "banking finance ...", ...}
+#                          or [{"label": "FinTech", "description": "banking finance ..."}, ...]
+#   .csv                   header row with `label` and `description` columns
+# YAML needs PyYAML; JSON and CSV only need the standard library. File order is kept.
+
+LABEL_COLUMNS = ("label", "domain", "name")
+DESCRIPTION_COLUMNS = ("description", "keywords", "text")
+
+
+def _pick(entry, columns, path, what):
+    for column in columns:
+        if column in entry:
+            return entry[column]
+    raise ValueError(f"❌ {path}: entry {entry!r} has no {what} (expected one of: {', '.join(columns)}).")
+
+def _from_structure(data, path):
+    if isinstance(data, dict):
+        return list(data.items())
+    if isinstance(data, list):
+        return [
+            (_pick(entry, LABEL_COLUMNS, path, "label"), _pick(entry, DESCRIPTION_COLUMNS, path, "description"))
+            for entry in data
+        ]
+    raise ValueError(f"❌ {path}: expected a mapping or a list of entries, got {type(data).__name__}.")
+
+def _read_yaml(path):
+    try:
+        import yaml
+    except ImportError:
+        raise RuntimeError(f"❌ Reading {path} needs PyYAML (pip install pyyaml), or use JSON / CSV.")
+    with open(path, encoding="utf-8") as f:
+        return yaml.safe_load(f)
+
+def _read_csv(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return [{key.strip().lower(): value for key, value in row.items() if key} for row in csv.DictReader(f)]
+
+# ✅ Load a Taxonomy File: Returns (labels, descriptions), Validated and in File Order
+def load_taxonomy(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".json":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    elif extension in (".yaml", ".yml"):
+        data = _read_yaml(path)
+    elif extension == ".csv":
+        data = _read_csv(path)
+    else:
+        raise ValueError(f"❌ Unsupported taxonomy format '{extension}' (use .json, .yaml, .yml or .csv).")
+
+    labels, descriptions, seen = [], [], set()
+    for label, description in _from_structure(data, path):
+        label = str(label).strip()
+        description = " ".join(str(description or "").split())
+        if not label or not description:
+            raise ValueError(f"❌ {path}: every domain needs a label and a description (got {label!r}).")
+        if label in seen:
+            raise ValueError(f"❌ {path}: duplicate domain label {label!r}.")
+        seen.add(label)
+        labels.append(label)
+        descriptions.append(description)
+
+    if not labels:
+        raise ValueError(f"❌ {path}: the taxonomy is empty.")
+    return labels, descriptions
@@ -291,11 +291,11 @@ if st.session_state.view == "chat":
     # Fetch and display messages
     try:
         chat_response = requests.get(
-            f"http://127.0.0.1:8000/get_messages/{st.session_state.chat_investor_id}",
+            f"http://127.0.0.1:8000/chat/fundraiser/{st.session_state.chat_investor_name}",
             timeout=10
         )
         chat_response.raise_for_status()
-        chat_messages = chat_response.json().get("messages", [])
+        chat_messages = chat_response.json().get("chat_history", [])
     except requests.exceptions.RequestException as e:
         show_message(f"Failed to load messages: {e}", "error")
         chat_messages = []
@@ -334,8 +334,8 @@ if st.session_state.view == "chat":
                 try:
                     with st.spinner("Sending..."):
                         send_response = requests.post(
-                            "http://127.0.0.1:8000/send_message/",
-                            json={"investor_id": st.session_state.chat_investor_id, "sender": "fundraiser", "message": new_message},
+                            "http://127.0.0.1:8000/chat/",
+                            json={"sender": "fundraiser", "receiver": st.session_state.chat_investor_name, "message": new_message},
                             timeout=10
                         )
                         send_response.raise_for_status()
@@ -343,9 +343,17 @@ if st.session_state.view == "chat":
                 except requests.exceptions.RequestException as e:
                     show_message(f"Message sending failed: {e}", "error")
     
-    # Auto refresh
+    # Auto refresh: long-poll until a new message arrives (server holds the request), then rerun
     if st.session_state.auto_refresh:
-        time.sleep(3)
+        last_id = chat_messages[-1].get("id", 0) if chat_messages else 0
+        try:
+            requests.get(
+                f"http://127.0.0.1:8000/chat/fundraiser/{st.session_state.chat_investor_name}/poll",
+                params={"since": last_id, "timeout": 25},
+                timeout=30
+            )
+        except requests.exceptions.RequestException:
+            time.sleep(3)
         st.experimental_rerun()
 
 else:
@@ -441,7 +449,15 @@ else:
                     try:
                         investor_response = requests.post(
                             "http://127.0.0.1:8000/investors/",
-                            json={"selected_domain": st.session_state.selected_domain},
+                            json={
+                                "selected_domain": st.session_state.selected_domain,
+                                "limit": 20,
+                                "fields": [
+                                    "investor_id", "investor_name", "investor_company", "investor_experience(years)",
+                                    "no_of_companies_invested", "domains", "linkedin_url", "email",
+                                    "funds_available", "match_score"
+                                ]
+                            },
                             timeout=50
                         )
                         investor_response.raise_for_status()
@@ -458,7 +474,7 @@ else:
                             """, unsafe_allow_html=True)
                             
                             # Display investors
-                            investors_df = pd.DataFrame(investors)
+                            investors_df = pd.DataFrame(investors.get("investors", []))
                             
                             if not investors_df.empty:
                                 for idx, investor in investors_df.iterrows():
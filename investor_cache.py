@@ -0,0 +1,101 @@
+import hashlib
+import os
+import tempfile
+
+import pandas as pd
+
+# 🔹 Bump When the Cleaning in load_investor_data Changes, so Old Caches Are Ignored
+INVESTOR_CACHE_FORMAT = 1
+
+# ✅ Columns Every Investor Sheet Must Provide
+REQUIRED_INVESTOR_COLUMNS = [
+    "investor_name", "investor_company", "investor_experience(years)", "no_of_companies_invested",
+    "domains", "linkedin_url", "email", "funds_available", "past_companies"
+]
+
+
+# ✅ Load & Normalize Investor Data (the Excel + cleanup path; free of import side effects, so
+# benchmarks and tools can use it without importing main)
+def load_investor_data(path):
+    try:
+        df = pd.read_excel(path).fillna("Not Available")
+    except Exception as e:
+        raise RuntimeError(f"❌ Error loading investor data: {e}")
+
+    # 🔹 Reject Malformed Sheets Before They Can Replace the Live Data
+    missing_columns = [col for col in REQUIRED_INVESTOR_COLUMNS if col not in df.columns]
+    if missing_columns:
+        raise RuntimeError(f"❌ Investor sheet is missing columns: {missing_columns}")
+    if df.empty:
+        raise RuntimeError("❌ Investor sheet has no rows.")
+
+    # 🔹 Ensure 'investor_experience(years)' is numeric
+    df["investor_experience(years)"] = (
+        df["investor_experience(years)"]
+        .astype(str)
+        .str.extract(r'(\d+)', expand=False)
+        .astype(float)
+        .fillna(0)
+    )
+
+    # 🔹 Ensure 'no_of_companies_invested' is numeric
+    df["no_of_companies_invested"] = pd.to_numeric(df["no_of_companies_invested"], errors="coerce").fillna(0)
+
+    return df
+
+def source_hash(path):
+    digest = hashlib.sha256(f"format={INVESTOR_CACHE_FORMAT}\0".encode())
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def cache_path(path, cache_dir):
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f"{name}-{source_hash(path)[:16]}.parquet")
+
+# ✅ Load the Cleaned Investor Table from a Parquet Cache Keyed by the Source File's Hash
+# Falls back to `load(path)` (the Excel + cleanup path) on a miss and stores the result.
+# Without pyarrow the cache is skipped and every start reads the Excel file as before.
+def load_with_cache(path, load, cache_dir):
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return load(path)
+
+    cached = cache_path(path, cache_dir)
+    if os.path.exists(cached):
+        try:
+            return pd.read_parquet(cached)
+        except Exception as e:
+            print(f"❌ Ignoring unreadable investor cache {cached}: {e}")
+
+    df = load(path)
+    write_cache(df, cached)
+    return df
+
+def write_cache(df, cached):
+    os.makedirs(os.path.dirname(cached) or ".", exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".investors-", suffix=".parquet", dir=os.path.dirname(cached) or ".")
+    os.close(fd)
+    try:
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, cached)  # 🔹 Readers never see a half-written cache file
+    except Exception as e:
+        os.remove(tmp_path)
+        print(f"❌ Could not write investor cache {cached}: {e}")
+        return
+    remove_stale_caches(cached)
+
+# 🔹 Each Sheet Edit Writes a New <name>-<hash>.parquet: Drop the Older Ones of the Same Sheet
+# (a worker still reading one has it open, so its read completes)
+def remove_stale_caches(cached):
+    cache_dir, current = os.path.split(cached)
+    prefix = current.rsplit("-", 1)[0] + "-"
+    for name in os.listdir(cache_dir or "."):
+        digest = name[len(prefix):-len(".parquet")]
+        if name.startswith(prefix) and name.endswith(".parquet") and len(digest) == 16 and name != current:
+            try:
+                os.remove(os.path.join(cache_dir, name))
+            except OSError:
+                pass
@@ -1,8 +1,13 @@
 import pandas as pd
 import re
+from investor_index import InvestorIndex
 
 INVESTOR_XLSX_PATH = "investors_data.xlsx"
 
+# ✅ Match score weights
+EXPERIENCE_WEIGHT = 0.6  # Higher weight for experience
+COMPANIES_WEIGHT = 0.4   # Slightly less weight for no. of companies
+
 def load_investor_data():
     try:
         df = pd.read_excel(INVESTOR_XLSX_PATH)
@@ -47,16 +52,16 @@ def load_investor_data():
     # ✅ Convert funds_available to numeric (removing $, M, B indicators)
     def convert_funds(value):
         if isinstance(value, str):
-            value = value.replace("$", "").upper()
-            if "M" in value:
-                return float(value.replace("M", "")) * 1_000_000
-            elif "B" in value:
-                return float(value.replace("B", "")) * 1_000_000_000
-            else:
-                try:
+            value = value.replace("$", "").replace(",", "").strip().upper()
+            try:
+                if value.endswith("M"):
+                    return float(value[:-1]) * 1_000_000
+                elif value.endswith("B"):
+                    return float(value[:-1]) * 1_000_000_000
+                else:
                     return float(value)
-                except ValueError:
-                    return 0
+            except ValueError:
+                return 0  # e.g. "Not Available"
         return 0
 
     df["funds_available"] = df["funds_available"].apply(convert_funds)
@@ -69,44 +74,32 @@ def load_investor_data():
 # Load and normalize the investor data
 df = load_investor_data()
 
-# ✅ Function to compute a match score
-def compute_match_score(row):
-    experience_weight = 0.6  # Higher weight for experience
-    companies_weight = 0.4   # Slightly less weight for no. of companies
-
-    score = (
-        (row["investor_experience(years)"] * experience_weight) +
-        (row["no_of_companies_invested"] * companies_weight)
-    )
-    return round(score, 2)
+# ✅ Domain index built once: tokenized domains -> investor rows, pre-sorted by match score
+investor_index = InvestorIndex(df, experience_weight=EXPERIENCE_WEIGHT, companies_weight=COMPANIES_WEIGHT) if not df.empty else None
+if investor_index is not None:
+    investor_index.df["match_score"] = investor_index.df["match_score"].round(2)
 
 # ✅ Function to get matching investors based on domain
 def get_matching_investors(selected_domain, investor_type=None):
-    if df.empty:
+    if investor_index is None:
         return {"message": "Investor data is not available."}
 
-    # Filter by domain (Must Match)
-    filtered_df = df[df['domains'].astype(str).str.contains(selected_domain, case=False, na=False)].copy()
-    
+    # Look up by domain (Must Match); rows come back sorted by match score (highest first)
+    sorted_df = investor_index.df.iloc[investor_index.lookup(selected_domain)].copy()
+
     # Ensure investor_type column exists before filtering
-    if investor_type and "investor_type" in df.columns:
-        filtered_df = filtered_df[filtered_df['investor_type'].astype(str).str.contains(investor_type, case=False, na=False)]
+    if investor_type and "investor_type" in sorted_df.columns:
+        sorted_df = sorted_df[sorted_df['investor_type'].astype(str).str.contains(investor_type, case=False, na=False, regex=False)]
 
-    if filtered_df.empty:
+    if sorted_df.empty:
         return {"message": f"No investors found for domain: {selected_domain}"}
 
-    # Compute match scores
-    filtered_df.loc[:, "match_score"] = filtered_df.apply(compute_match_score, axis=1)
-
     # Normalize the scores for visualization (scale to 100%)
-    max_score = filtered_df["match_score"].max()
+    max_score = sorted_df["match_score"].max()
     if max_score > 0:
-        filtered_df.loc[:, "scaled_score"] = (filtered_df["match_score"] / max_score) * 100
+        sorted_df.loc[:, "scaled_score"] = (sorted_df["match_score"] / max_score) * 100
     else:
-        filtered_df.loc[:, "scaled_score"] = 0  # If all scores are zero
-
-    # Sort by match score (highest first)
-    sorted_df = filtered_df.sort_values(by="match_score", ascending=False)
+        sorted_df.loc[:, "scaled_score"] = 0  # If all scores are zero
 
     # Add hover tooltip for scaled_score visualization
     sorted_df.loc[:, "tooltip"] = sorted_df["scaled_score"].apply(lambda x: f"{x:.2f}% Match")
@@ -0,0 +1,166 @@
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+
+from domain_index import normalize_rows, top_k, QuantizedMatrix
+
+INVESTOR_TEXT_COLUMNS = ["domains", "past_companies"]
+ENCODE_BATCH_SIZE = 256
+
+
+# 🔹 Text Embedded per Investor: Their Domains plus Past Portfolio Companies
+def investor_texts(df):
+    parts = [df[col].astype(str).replace("Not Available", "") for col in INVESTOR_TEXT_COLUMNS if col in df.columns]
+    texts = parts[0]
+    for part in parts[1:]:
+        texts = texts + ". " + part
+    return texts.str.strip(" .").tolist()
+
+def text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+# ✅ Content-Hash Cache of Text Embeddings: Only New or Edited Texts Are Re-Encoded
+# Used for investor rows (main.py) and for domain descriptions (ml_model.py), one file per `name` & model.
+class EmbeddingCache:
+    def __init__(self, model_id, cache_dir=None, name="investor_embeddings"):
+        self.model_id = model_id
+        self.path = None
+        if cache_dir:
+            safe_model = "".join(c if c.isalnum() else "_" for c in model_id)
+            self.path = os.path.join(cache_dir, f"{name}-{safe_model}.npz")
+
+        self.vectors_by_hash = {}
+        self.last_encoded = 0
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path) as data:
+                self.vectors_by_hash = dict(zip(data["keys"].tolist(), data["vectors"]))
+        except Exception as e:
+            print(f"❌ Ignoring unreadable embedding cache {self.path}: {e}")
+
+    def _save(self):
+        if not self.path or not self.vectors_by_hash:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".embeddings-", suffix=".npz", dir=os.path.dirname(self.path) or ".")
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, keys=np.array(list(self.vectors_by_hash)), vectors=np.stack(list(self.vectors_by_hash.values())))
+        os.replace(tmp_path, self.path)
+
+    # 🔹 Normalized (n_rows, dim) Matrix for `texts`, Encoding Only Unseen Texts in Batches
+    # The vectors live on disk between calls, so each worker keeps no second copy of them in memory.
+    def embed(self, texts, encode):
+        self._load()
+        hashes = [text_hash(text) for text in texts]
+        missing = {}
+        for h, text in zip(hashes, texts):
+            if h not in self.vectors_by_hash:
+                missing.setdefault(h, text)
+
+        missing_hashes = list(missing)
+        for start in range(0, len(missing_hashes), ENCODE_BATCH_SIZE):
+            batch = missing_hashes[start:start + ENCODE_BATCH_SIZE]
+            vectors = normalize_rows(encode([missing[h] for h in batch]))
+            self.vectors_by_hash.update(zip(batch, vectors))
+        self.last_encoded = len(missing_hashes)
+
+        # 🔹 Keep Only Texts Still in Use so the Cache Stays Bounded
+        live = set(hashes)
+        if len(self.vectors_by_hash) != len(live) or missing_hashes:
+            self.vectors_by_hash = {h: v for h, v in self.vectors_by_hash.items() if h in live}
+            self._save()
+
+        vectors = np.stack([self.vectors_by_hash[h] for h in hashes]).astype(np.float32)
+        if self.path:
+            self.vectors_by_hash = {}
+        return vectors
+
+
+# ✅ Swap an Array for a Read-Only Memory Map of a Content-Addressed .npy in `share_dir`
+# Every worker building the same matrix maps the same file, so the OS page cache holds one
+# copy for all of them. Older files are unlinked; workers still mapping them keep valid pages.
+def map_shared(array, share_dir, prefix):
+    array = np.ascontiguousarray(array)
+    digest = hashlib.sha256(f"{array.dtype.str}{array.shape}".encode())
+    digest.update(memoryview(array).cast("B"))
+    path = os.path.join(share_dir, f"{prefix}-{digest.hexdigest()[:16]}.npy")
+
+    if not os.path.exists(path):
+        os.makedirs(share_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{prefix}-", suffix=".npy", dir=share_dir)
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, array)
+        os.replace(tmp_path, path)
+    try:
+        shared = np.load(path, mmap_mode="r")
+    except OSError:
+        return array  # 🔹 Removed by a worker on a newer sheet in between: keep a private copy
+
+    for name in os.listdir(share_dir):
+        if name.startswith(f"{prefix}-") and name.endswith(".npy") and name != os.path.basename(path):
+            try:
+                os.remove(os.path.join(share_dir, name))
+            except OSError:
+                pass
+    return shared
+
+
+# ✅ Semantic Retrieval: One Matrix-Vector Product Blended with the Precomputed Match Score
+# The normalized match score is stored as an extra column next to the embeddings, so
+# [vectors | score] @ [w * query, 1 - w] yields the blended score in a single pass over memory.
+# With precision "float16"/"int8" the embeddings are scored on a compact copy instead, and `rerank`
+# > 0 re-scores that many best candidates on full-precision vectors (memory-mapped when shared).
+class SemanticInvestorIndex:
+    def __init__(self, vectors, match_scores, share_dir=None, precision="float32", rerank=0):
+        match_scores = np.asarray(match_scores, dtype=np.float32)
+        max_score = float(match_scores.max()) if len(match_scores) else 0.0
+        base_scores = match_scores / max_score if max_score > 0 else np.zeros_like(match_scores)
+        vectors = np.asarray(vectors, dtype=np.float32)
+        self.dim = vectors.shape[1]
+        self.quantized = None
+        self.rerank = rerank if precision != "float32" else 0
+
+        if precision == "float32":
+            self.matrix = np.hstack([vectors, base_scores[:, None]])
+            if share_dir:
+                self.matrix = map_shared(self.matrix, share_dir, "investor-semantic")
+            self.vectors = self.matrix[:, :-1]
+            return
+
+        self.quantized = QuantizedMatrix(vectors, precision)
+        self.base_scores = base_scores
+        self.vectors = None
+        if share_dir:
+            self.quantized.codes = map_shared(self.quantized.codes, share_dir, f"investor-{precision}")
+        if self.rerank:
+            self.vectors = map_shared(vectors, share_dir, "investor-exact") if share_dir else vectors
+
+    def __len__(self):
+        return self.vectors.shape[0] if self.quantized is None else self.quantized.shape[0]
+
+    # 🔹 Returns (row ids, cosine similarities, blended scores), best first
+    def search(self, query_vector, k=10, semantic_weight=0.7):
+        query = normalize_rows(query_vector)[0]
+        if self.quantized is None:
+            blended = self.matrix @ np.append(semantic_weight * query, 1 - semantic_weight).astype(np.float32)
+            row_ids, scores = top_k(blended.reshape(1, -1), k)
+            return row_ids[0], self.vectors[row_ids[0]] @ query, scores[0]
+
+        similarities = self.quantized.dot(query.reshape(1, -1))[0]
+        blended = semantic_weight * similarities + (1 - semantic_weight) * self.base_scores
+        row_ids, scores = top_k(blended.reshape(1, -1), max(k, self.rerank))
+        if not self.rerank:
+            return row_ids[0], similarities[row_ids[0]], scores[0]
+
+        # 🔹 Exact Re-Rank: Blend Full-Precision Similarities of the Candidates, Keep the Best k
+        candidates = row_ids[0]
+        exact = np.asarray(self.vectors[candidates], dtype=np.float32) @ query
+        exact_blended = semantic_weight * exact + (1 - semantic_weight) * self.base_scores[candidates]
+        order, scores = top_k(exact_blended.reshape(1, -1), k)
+        return candidates[order[0]], exact[order[0]], scores[0]
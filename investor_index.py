@@ -0,0 +1,112 @@
+import re
+from collections import defaultdict
+
+import numpy as np
+
+# 🔹 Alternative Spellings Mapped to the Canonical Domain Names Used by the Classifier
+DOMAIN_ALIASES = {
+    "AI": "AI & ML",
+    "ML": "AI & ML",
+    "AI/ML": "AI & ML",
+    "Artificial Intelligence": "AI & ML",
+    "Machine Learning": "AI & ML",
+    "Web3": "Web3 & Crypto",
+    "Crypto": "Web3 & Crypto",
+    "Blockchain": "Web3 & Crypto",
+    "AR": "AR/VR",
+    "VR": "AR/VR",
+    "Augmented Reality": "AR/VR",
+    "Virtual Reality": "AR/VR",
+    "Internet of Things": "IoT",
+    "Health": "Healthcare",
+    "HealthTech": "Healthcare",
+    "E-commerce": "Ecommerce",
+    "Biotech": "Bio-Tech",
+    "PropTech": "Prop-Tech",
+    "Real Estate": "Prop-Tech",
+    "Automotive": "Automobile",
+    "Logistics": "Supply Chain",
+    "Cyber Security": "Cybersecurity",
+}
+
+DOMAIN_SEPARATORS = re.compile(r"[,;|\n]")
+
+# 🔹 Placeholders Written by fillna()/column defaults, Never Indexed as Domains
+MISSING_DOMAIN_KEYS = {"notavailable", "unknown", "nan"}
+
+# 🔹 Case/Punctuation-Insensitive Key: "AI & ML", "ai and ml" and "AI-and-ML" all match
+def normalize_domain(name):
+    name = str(name).lower().replace("&", " and ")
+    return re.sub(r"[^0-9a-z]+", "", name)
+
+def split_domains(cell):
+    return [token.strip() for token in DOMAIN_SEPARATORS.split(str(cell)) if token.strip()]
+
+
+# ✅ Inverted Index from Normalized Domain to Investor Rows, Pre-Sorted by Match Score
+class InvestorIndex:
+    def __init__(self, df, experience_weight=0.7, companies_weight=0.3, aliases=DOMAIN_ALIASES):
+        self.df = df.reset_index(drop=True).copy()
+
+        # 🔹 Match Scores Computed Once at Load
+        self.df["match_score"] = (
+            self.df["investor_experience(years)"] * experience_weight +
+            self.df["no_of_companies_invested"] * companies_weight
+        )
+        self.scores = self.df["match_score"].to_numpy(dtype=np.float64)
+
+        self.aliases = {normalize_domain(alias): normalize_domain(target) for alias, target in aliases.items()}
+
+        # 🔹 Tokenize Each 'domains' Cell Once
+        rows_by_domain = defaultdict(list)
+        self.domain_names = {}
+        for row, cell in enumerate(self.df["domains"].astype(str)):
+            for token in split_domains(cell):
+                key = normalize_domain(token)
+                if key and key not in MISSING_DOMAIN_KEYS:
+                    rows_by_domain[key].append(row)
+                    self.domain_names.setdefault(key, token)
+
+        self.postings = {}
+        for key, rows in rows_by_domain.items():
+            rows = np.unique(np.asarray(rows, dtype=np.int64))
+            self.postings[key] = rows[np.argsort(-self.scores[rows], kind="stable")]
+
+    def __len__(self):
+        return len(self.df)
+
+    # 🔹 Exact or Alias Match First; Substring Match over the (small) Domain Vocabulary Otherwise
+    def resolve(self, domain):
+        key = normalize_domain(domain)
+        key = self.aliases.get(key, key)
+        if not key:
+            return []
+        if key in self.postings:
+            return [key]
+        return [candidate for candidate in self.postings if key in candidate]
+
+    # 🔹 Row Ids of Matching Investors, Highest Match Score First
+    def lookup(self, domain):
+        return self.page(domain, 0, None)[0]
+
+    # 🔹 One Page of the Ranking as (row ids, total matches); ties are broken by row order
+    def page(self, domain, offset=0, limit=None):
+        keys = self.resolve(domain)
+        if not keys:
+            return np.empty(0, dtype=np.int64), 0
+
+        end = None if limit is None else offset + limit
+        if len(keys) == 1:
+            rows = self.postings[keys[0]]  # 🔹 Already ranked at load: a page is a slice
+            return rows[offset:end], len(rows)
+
+        rows = np.unique(np.concatenate([self.postings[key] for key in keys]))
+        total = len(rows)
+        if end is not None and end < total:
+            # 🔹 Partial Sort: Keep Rows Scoring at Least the `end`-th Best Score, Then Order Only Those
+            scores = self.scores[rows]
+            cutoff = np.partition(-scores, end - 1)[end - 1]
+            rows = rows[-scores <= cutoff]
+
+        ranked = rows[np.lexsort((rows, -self.scores[rows]))]
+        return ranked[offset:end], total
@@ -0,0 +1,99 @@
+import os
+import threading
+import time
+
+from investor_cache import source_hash
+
+
+# ✅ Immutable View of the Investor Table and Everything Derived from It
+class InvestorSnapshot:
+    def __init__(self, index, source_mtime, version, semantic=None):
+        self.index = index
+        self.semantic = semantic  # 🔹 SemanticInvestorIndex over the same rows, if an encoder is available
+        self.source_mtime = source_mtime
+        self.version = version
+        self.loaded_at = time.time()
+
+    @property
+    def df(self):
+        return self.index.df
+
+    @property
+    def rows(self):
+        return len(self.index)
+
+
+# ✅ Double-Buffered Investor Data: Build the Next Snapshot Aside, Then Swap One Reference
+# Readers grab `store.snapshot` once per request, so they always see a complete table even
+# while a reload is running; a sheet that fails to build never replaces the live snapshot.
+class InvestorStore:
+    def __init__(self, path, build_index, build_semantic=None):
+        self.path = path
+        self.build_index = build_index
+        self.build_semantic = build_semantic
+        self.snapshot = None
+        self.last_reload = None
+        self._failed_mtime = None
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        self._stop = threading.Event()
+
+    def reload(self, force=False):
+        with self._reload_lock:
+            start = time.perf_counter()
+            previous = self.snapshot
+            report = {"previous_rows": previous.rows if previous else 0, "source": self.path}
+
+            try:
+                source_mtime = os.stat(self.path).st_mtime
+                # 🔹 Skip Unchanged Files and Files That Already Failed to Load
+                if not force and previous is not None and source_mtime in (previous.source_mtime, self._failed_mtime):
+                    report.update(status="unchanged", rows=previous.rows, version=previous.version)
+                    return report
+
+                self._failed_mtime = source_mtime
+                # 🔹 Version = Content Hash, so Every Worker Serving the Same Sheet Reports the Same One
+                # (pagination cursors carry it; a worker on another sheet rejects them)
+                next_version = source_hash(self.path)[:16]
+                index = self.build_index(self.path)
+                semantic = self.build_semantic(index) if self.build_semantic else None
+                self._failed_mtime = None
+                self.snapshot = InvestorSnapshot(index, source_mtime, next_version, semantic)  # 🔹 Atomic swap
+                report.update(status="reloaded", rows=self.snapshot.rows, version=next_version)
+            except Exception as e:
+                report.update(status="failed", error=str(e), rows=report["previous_rows"],
+                              version=previous.version if previous else None)
+            finally:
+                report["duration_seconds"] = round(time.perf_counter() - start, 4)
+                report["finished_at"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+                if report.get("status") != "unchanged":
+                    self.last_reload = report
+                    print(f"✅ Investor reload {report['status']}: {report['rows']} rows in {report['duration_seconds']:.3f}s"
+                          if report["status"] == "reloaded" else f"❌ Investor reload failed: {report.get('error')}")
+
+            return report
+
+    # 🔹 Build the Semantic Index for the Live Rows (e.g. once the encoder has loaded) and Swap It In
+    def attach_semantic(self):
+        with self._reload_lock:
+            current = self.snapshot
+            if current is None or self.build_semantic is None:
+                return None
+            semantic = self.build_semantic(current.index)
+            self.snapshot = InvestorSnapshot(current.index, current.source_mtime, current.version, semantic)
+            return semantic
+
+    # 🔹 Poll the Source File's mtime and Reload in the Background When It Changes
+    def start_watcher(self, interval_seconds):
+        if interval_seconds <= 0 or self._watcher is not None:
+            return
+
+        def watch():
+            while not self._stop.wait(interval_seconds):
+                self.reload()
+
+        self._watcher = threading.Thread(target=watch, name="investor-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self):
+        self._stop.set()
@@ -0,0 +1,38 @@
+from domain_index import normalize_rows
+
+# 🔹 Bounded Work for Long Descriptions (pasted pitch decks): Cut to a Character Budget, Split
+# into Word Windows That Fit the Encoder, and Pool the Chunk Embeddings into One Query Vector
+
+POOLING_METHODS = ("mean", "max")
+
+
+# 🔹 True When the Text Needs the Chunked Path (checks characters first, so huge input is cheap to test)
+def is_long_text(text, chunk_words, max_chars):
+    if len(text) > max_chars:
+        return True
+    return len(text.split()) > chunk_words
+
+# ✅ Returns (chunks, truncated): At Most `max_chunks` Windows of `chunk_words` Words Taken from
+# the First `max_chars` Characters; `truncated` Says Whether Any Input Was Left Out
+def split_into_chunks(text, chunk_words=128, max_chunks=16, max_chars=16000):
+    truncated = len(text) > max_chars
+    if truncated:
+        text = text[:max_chars]
+        cut = text.rfind(" ")
+        text = text[:cut] if cut > 0 else text  # 🔹 Do not keep half a word
+
+    words = text.split()
+    budget = chunk_words * max_chunks
+    if len(words) > budget:
+        words = words[:budget]
+        truncated = True
+    chunks = [" ".join(words[start:start + chunk_words]) for start in range(0, len(words), chunk_words)]
+    return chunks or [text.strip()], truncated
+
+# 🔹 One Unit Vector from (n_chunks, dim) Chunk Embeddings: Mean (overall topic) or Max (strongest signals)
+def pool_embeddings(vectors, method="mean"):
+    if method not in POOLING_METHODS:
+        raise ValueError(f"❌ Unknown pooling: {method}. Use one of {list(POOLING_METHODS)}.")
+    vectors = normalize_rows(vectors)
+    pooled = vectors.mean(axis=0) if method == "mean" else vectors.max(axis=0)
+    return normalize_rows(pooled)[0]
@@ -0,0 +1,56 @@
+import argparse
+import json
+import os
+
+from memory_stats import memory_breakdown, format_bytes
+
+# 🔹 Per-Worker Unique vs Shared Memory of a Running Server (Linux)
+# Pass the master's pid (gunicorn/uvicorn); its worker processes are found through /proc.
+# USS = pages only that process holds; PSS sums to the real total across processes.
+
+def child_pids(pid):
+    children = []
+    for task in os.listdir(f"/proc/{pid}/task"):
+        try:
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                children.extend(int(child) for child in f.read().split())
+        except OSError:
+            continue
+    return children
+
+def process_name(pid):
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            return f.read().replace(b"\0", b" ").decode(errors="replace").strip()[:60]
+    except OSError:
+        return "?"
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-process USS/PSS report for a multi-worker server")
+    parser.add_argument("pid", type=int, help="Pid of the server's master process")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    args = parser.parse_args()
+
+    rows = []
+    for pid in [args.pid] + child_pids(args.pid):
+        breakdown = memory_breakdown(pid)
+        if breakdown:
+            rows.append({"pid": pid, "name": process_name(pid), **breakdown})
+    if not rows:
+        raise SystemExit(f"❌ No readable /proc/<pid>/smaps_rollup for pid {args.pid} (Linux only, same user).")
+
+    totals = {key: sum(row[key] for row in rows) for key in ("rss", "pss", "uss", "shared", "swap")}
+    if args.json:
+        print(json.dumps({"processes": rows, "totals": totals}, indent=2))
+        return
+
+    print(f"{'pid':>8}  {'RSS':>11}  {'PSS':>11}  {'USS':>11}  {'shared':>11}  command")
+    for row in rows:
+        print(f"{row['pid']:>8}  {format_bytes(row['rss']):>11}  {format_bytes(row['pss']):>11}  "
+              f"{format_bytes(row['uss']):>11}  {format_bytes(row['shared']):>11}  {row['name']}")
+    print(f"{'total':>8}  {format_bytes(totals['rss']):>11}  {format_bytes(totals['pss']):>11}  "
+          f"{format_bytes(totals['uss']):>11}  {format_bytes(totals['shared']):>11}")
+    print("📊 Box-wide footprint is the PSS total; RSS double-counts shared pages.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import os
+import resource
+import sys
+
+
+# 🔹 Current Resident Set Size of This Process (bytes)
+def process_rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return peak_rss_bytes()
+
+# 🔹 Peak Resident Set Size of This Process (bytes)
+def peak_rss_bytes():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux reports KiB
+
+# 🔹 Peak Resident Set Size of Another Process (bytes; Linux, None Elsewhere)
+def process_peak_rss_bytes(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+# 🔹 Weight Memory Held by Torch Models, Counting Shared Tensors Once
+def model_parameter_bytes(*models):
+    seen = set()
+    total = 0
+    for model in models:
+        if model is None or not hasattr(model, "parameters"):
+            continue
+        for tensor in list(model.parameters()) + list(model.buffers()):
+            ptr = tensor.data_ptr()
+            if ptr in seen:
+                continue
+            seen.add(ptr)
+            total += tensor.numel() * tensor.element_size()
+    return total
+
+# 🔹 Proportional / Unique / Shared Memory of a Process from /proc/<pid>/smaps_rollup (Linux)
+# USS (private pages) is what the process alone costs; PSS splits each shared page among its users,
+# so summing PSS over all workers gives their true combined footprint. Returns None elsewhere.
+def memory_breakdown(pid="self"):
+    fields = {}
+    for name in ("smaps_rollup", "smaps"):
+        try:
+            with open(f"/proc/{pid}/{name}") as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) == 3 and parts[2] == "kB":
+                        fields[parts[0].rstrip(":")] = fields.get(parts[0].rstrip(":"), 0) + int(parts[1]) * 1024
+            break
+        except (OSError, ValueError):
+            continue
+    if not fields:
+        return None
+
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "uss": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+        "shared": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+        "swap": fields.get("Swap", 0),
+    }
+
+def format_bytes(num_bytes):
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(num_bytes) < 1024 or unit == "GiB":
+            return f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
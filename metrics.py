@@ -0,0 +1,260 @@
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+# 🔹 Lightweight In-Process Metrics in Prometheus Text Format (no client library needed)
+# Recording is a dict lookup plus a few additions under a per-metric lock, cheap enough to
+# leave on for every request. Gauges are callbacks read only when /metrics is scraped.
+
+LATENCY_BUCKETS = [0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in list(zip(names, values)) + list(extra)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues, amount=1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labelvalues, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, labelvalues)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = list(buckets)
+        self._series = {}  # labelvalues -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labelvalues):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = sorted((labelvalues, list(series)) for labelvalues, series in self._series.items())
+        for labelvalues, series in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets + [float("inf")], series[:-1]):
+                cumulative += count
+                lines.append(
+                    f"{self.name}_bucket{_labels(self.labelnames, labelvalues, [('le', _number(float(bound)))])} {cumulative}"
+                )
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labelvalues)} {_number(series[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labelvalues)} {cumulative}")
+        return lines
+
+    # 🔹 JSON Summary of One Series for the /…/stats Endpoints; `scale` Converts Units (1000: seconds -> ms)
+    # p50/p99 are the upper bound of the bucket holding that quantile (None if empty or above the last bucket)
+    def summary(self, *labelvalues, scale=1):
+        with self._lock:
+            series = list(self._series.get(labelvalues, [0] * (len(self.buckets) + 1) + [0.0]))
+        counts, total = series[:-1], sum(series[:-1])
+        bounds = [bound * scale for bound in self.buckets]
+        labels = [f"<={bound:g}" for bound in bounds] + [f">{bounds[-1]:g}"]
+
+        def quantile(q):
+            seen = 0
+            for bound, count in zip(bounds, counts):
+                seen += count
+                if total and seen >= q * total:
+                    return bound
+            return None
+
+        return {
+            "buckets": dict(zip(labels, counts)),
+            "count": total,
+            "mean": round(series[-1] * scale / total, 4) if total else None,
+            "p50": quantile(0.5),
+            "p99": quantile(0.99),
+        }
+
+
+# 🔹 Values Read at Scrape Time: `collect()` Returns a Number or a {labelvalues tuple: number} Dict
+class GaugeCallback:
+    def __init__(self, name, documentation, collect, labelnames=(), kind="gauge"):
+        self.name = name
+        self.documentation = documentation
+        self.collect = collect
+        self.labelnames = tuple(labelnames)
+        self.kind = kind
+
+    def render(self):
+        try:
+            values = self.collect()
+        except Exception:
+            return []  # 🔹 A failing collector must never break the scrape
+        if values is None:
+            return []
+        if not isinstance(values, dict):
+            values = {(): values}
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for labelvalues, value in sorted(values.items()):
+            if value is not None:
+                lines.append(f"{self.name}{_labels(self.labelnames, labelvalues)} {_number(value)}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name, documentation, collect, labelnames=(), kind="gauge"):
+        return self.register(GaugeCallback(name, documentation, collect, labelnames, kind))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "pdc_stage_duration_seconds", "Time spent in each hot-path stage.", ["stage"]
+)
+REQUESTS_TOTAL = REGISTRY.counter(
+    "pdc_http_requests_total", "HTTP requests by endpoint, method and status.", ["endpoint", "method", "status"]
+)
+REQUEST_SECONDS = REGISTRY.histogram(
+    "pdc_http_request_duration_seconds", "HTTP request latency by endpoint.", ["endpoint", "method"]
+)
+ERRORS_TOTAL = REGISTRY.counter(
+    "pdc_errors_total", "Failures by stage and exception type.", ["stage", "error"]
+)
+
+
+# ✅ Per-Request Stage Breakdown (for Server-Timing)
+# The active request's list of (stage, seconds) travels in a context variable; work done on other
+# threads on the request's behalf hands its timings back with `add_stages`.
+_request_stages = contextvars.ContextVar("request_stages", default=None)
+
+def add_stages(stages):
+    current = _request_stages.get()
+    if current is not None and stages:
+        current.extend(stages)
+
+@contextmanager
+def collect_stages(stages):
+    token = _request_stages.set(stages)
+    try:
+        yield stages
+    finally:
+        _request_stages.reset(token)
+
+def record_stage(name, seconds):
+    STAGE_SECONDS.observe(seconds, name)
+    current = _request_stages.get()
+    if current is not None:
+        current.append((name, seconds))
+
+# 🔹 Time a Block as Stage `name`; an Exception Escaping It Is Counted Against That Stage
+# and tagged with it (`failed_stage(e)`), so a 500 can say where the request failed.
+@contextmanager
+def stage(name):
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        if getattr(e, "_failed_stage", None) is None:
+            ERRORS_TOTAL.inc(name, type(e).__name__)
+            try:
+                e._failed_stage = name
+            except AttributeError:
+                pass
+        raise
+    finally:
+        record_stage(name, time.perf_counter() - start)
+
+def failed_stage(error, default="unknown"):
+    return getattr(error, "_failed_stage", None) or default
+
+def server_timing_header(stages, total_seconds):
+    totals = {}
+    for name, seconds in stages:
+        totals[name] = totals.get(name, 0.0) + seconds
+    entries = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in totals.items()]
+    entries.append(f"total;dur={total_seconds * 1000:.2f}")
+    return ", ".join(entries)
+
+
+# ✅ ASGI Middleware: Request Counters & Latency by Route Template, Optional Server-Timing Header
+# server_timing: "1" adds the header to every response, "request" only when the client sends
+# `X-Server-Timing: 1`, "0" never.
+class MetricsMiddleware:
+    def __init__(self, app, server_timing="0"):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        stages = []
+        status = [500]
+        wants_timing = self.server_timing == "1" or (
+            self.server_timing == "request" and (b"x-server-timing", b"1") in scope.get("headers", [])
+        )
+
+        async def send_with_metrics(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                if wants_timing:
+                    header = server_timing_header(stages, time.perf_counter() - start)
+                    message = {**message, "headers": list(message.get("headers", [])) + [(b"server-timing", header.encode())]}
+            await send(message)
+
+        token = _request_stages.set(stages)
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            _request_stages.reset(token)
+            route = scope.get("route")
+            endpoint = getattr(route, "path", None) or "unmatched"
+            REQUESTS_TOTAL.inc(endpoint, scope["method"], str(status[0]))
+            REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint, scope["method"])
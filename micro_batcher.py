@@ -0,0 +1,173 @@
+import queue
+import threading
+import time
+from contextlib import nullcontext
+
+import metrics
+
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256]
+WAIT_SECONDS_BUCKETS = [0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.25]
+
+BATCH_SIZE_METRIC = metrics.REGISTRY.histogram(
+    "pdc_micro_batch_size", "Items per micro-batch.", ["batcher"], buckets=BATCH_SIZE_BUCKETS
+)
+BATCH_WAIT_METRIC = metrics.REGISTRY.histogram(
+    "pdc_micro_batch_wait_seconds", "Time an item waited in the queue before its batch ran.", ["batcher"],
+    buckets=WAIT_SECONDS_BUCKETS
+)
+BATCH_SECONDS_METRIC = metrics.REGISTRY.histogram(
+    "pdc_micro_batch_duration_seconds", "Time spent processing one micro-batch.", ["batcher"], buckets=WAIT_SECONDS_BUCKETS
+)
+
+
+class _Pending:
+    def __init__(self, item, deadline):
+        self.item = item
+        self.deadline = deadline
+        self.enqueued_at = time.perf_counter()
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+        self.stages = []  # 🔹 (stage, seconds) of the batch that served this item
+
+
+# ✅ Micro-Batching Scheduler: Concurrent Callers Are Grouped into One Batch Call
+# The first queued item opens a window; the batch is dispatched after `max_wait_seconds` or as
+# soon as `max_batch_size` items are waiting, whichever comes first. `process_batch(items)` must
+# return one result per item; an Exception in the result list is raised to that caller only.
+class MicroBatcher:
+    def __init__(self, process_batch, max_batch_size=32, max_wait_seconds=0.005, name="micro-batcher", profile_scope=nullcontext):
+        self.process_batch = process_batch
+        self.profile_scope = profile_scope  # 🔹 Context manager factory wrapped around each batch (profiler hook)
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self.name = name
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+        self.batches = 0
+        self.items = 0
+        self.failed_batches = 0
+        self.expired = 0
+        self.max_queue_depth = 0
+
+    # 🔹 Blocking: Enqueue One Item and Return Its Result (called from threadpool workers)
+    # Items whose `deadline` (time.monotonic()) has passed when their batch starts are skipped.
+    def submit(self, item, deadline=None):
+        self._ensure_started()
+        pending = _Pending(item, deadline)
+        self._queue.put(pending)
+        with self._stats_lock:
+            self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+
+        pending.event.wait()
+        metrics.add_stages(pending.stages)
+        if pending.error is not None:
+            raise pending.error
+        return pending.value
+
+    def _ensure_started(self):
+        # 🔹 Started Lazily so the Thread Belongs to the Process That Serves Requests (fork-safe)
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                    self._thread.start()
+
+    # 🔹 Finish Queued Work and Exit; the Next submit() Starts a Fresh Thread
+    def stop(self, timeout=5):
+        with self._start_lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout)
+
+    def _collect(self):
+        first = self._queue.get()
+        if first is None:
+            return None
+
+        batch = [first]
+        deadline = first.enqueued_at + self.max_wait_seconds
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                pending = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if pending is None:
+                self._queue.put(None)  # 🔹 Finish This Batch, Then Stop
+                break
+            batch.append(pending)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+
+            # 🔹 Callers That Already Gave Up Cost Nothing
+            now = time.monotonic()
+            live = []
+            for pending in batch:
+                if pending.deadline is not None and now >= pending.deadline:
+                    pending.error = TimeoutError("❌ Request expired before its batch ran.")
+                    pending.event.set()
+                else:
+                    live.append(pending)
+            with self._stats_lock:
+                self.expired += len(batch) - len(live)
+            batch = live
+            if not batch:
+                continue
+
+            started = time.perf_counter()
+            batch_stages = []
+            try:
+                with metrics.collect_stages(batch_stages), self.profile_scope():
+                    results = self.process_batch([pending.item for pending in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(f"❌ Batch returned {len(results)} results for {len(batch)} items.")
+            except Exception as e:
+                results = [e] * len(batch)
+                with self._stats_lock:
+                    self.failed_batches += 1
+            finished = time.perf_counter()
+            BATCH_SIZE_METRIC.observe(len(batch), self.name)
+            BATCH_SECONDS_METRIC.observe(finished - started, self.name)
+            for pending in batch:
+                BATCH_WAIT_METRIC.observe(started - pending.enqueued_at, self.name)
+                metrics.STAGE_SECONDS.observe(started - pending.enqueued_at, "batch_wait")
+                pending.stages = [("batch_wait", started - pending.enqueued_at)] + batch_stages
+
+            with self._stats_lock:
+                self.batches += 1
+                self.items += len(batch)
+
+            for pending, result in zip(batch, results):
+                if isinstance(result, Exception):
+                    pending.error = result
+                else:
+                    pending.value = result
+                pending.event.set()
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait_seconds * 1000,
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self.max_queue_depth,
+                "batches": self.batches,
+                "items": self.items,
+                "failed_batches": self.failed_batches,
+                "expired": self.expired,
+                "mean_batch_size": round(self.items / self.batches, 2) if self.batches else None,
+                "batch_size": BATCH_SIZE_METRIC.summary(self.name),
+                "wait_ms": BATCH_WAIT_METRIC.summary(self.name, scale=1000),
+                "batch_ms": BATCH_SECONDS_METRIC.summary(self.name, scale=1000),
+            }
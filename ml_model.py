@@ -1,66 +1,82 @@
-import pandas as pd
-import numpy as np
-import joblib
-import nltk
-import string
-from keybert import KeyBERT
-from sentence_transformers import SentenceTransformer
-from sklearn.neighbors import NearestNeighbors
+import argparse
+import os
+import time
 
-nltk.download('punkt')
-nltk.download('stopwords')
+from artifacts import write_artifact_bundle, load_artifact_bundle
+from domain_taxonomy import load_taxonomy
+from investor_embeddings import EmbeddingCache
 
-# 🔹 Define domains with expanded keywords
-domains = {
-    "FinTech": "banking finance investment fraud detection trading cryptocurrency payments stock exchange digital banking financial security fintech loans credit",
-    "EdTech": "learning education e-learning students courses AI tutors online classes skill development virtual learning academic platforms EdTech schools universities",
-    "Web3 & Crypto": "blockchain decentralization smart contracts NFTs DeFi cryptocurrencies DAO consensus Ethereum tokenization crypto DeFi",
-    "Healthcare": "medicine health diagnostics AI doctors hospitals treatment disease patient monitoring clinical trials medical AI pharma biotech",
-    "AgriTech": "agriculture crops farming irrigation soil monitoring yield prediction fertilizers precision agriculture AgriTech food production supply chain",
-    "Cybersecurity": "security encryption hacking firewalls malware phishing authentication cyber threats risk assessment digital forensics cyber attacks network security",
-    "IoT": "internet of things connected devices automation sensors cloud computing smart homes industry 4.0 IoT wearables edge computing smart cities",
-    "AI & ML": "machine learning artificial intelligence deep learning neural networks predictive modeling data science AI ML neural networks reinforcement learning",
-    "Robotics": "robots automation sensors industrial robots robotic arms AI-powered robots autonomous systems humanoid robots drone technology",
-    "AR/VR": "augmented reality virtual reality 3D immersive experiences gaming headsets mixed reality digital twins metaverse",
-    "EnergyTech": "renewable energy solar wind sustainability energy efficiency smart grids carbon footprint electric vehicles green tech carbon capture",
-    "LegalTech": "law compliance regulations AI-powered legal services contract analysis legal documents automation risk management",
-    "GovTech": "government digital transformation public services AI-powered governance smart cities citizen engagement e-governance digital policies",
-    "Supply Chain": "logistics warehousing inventory management supply chain AI demand forecasting transportation optimization blockchain logistics",
-    "EntertainmentTech": "streaming platforms AI-driven content recommendation gaming industry interactive media content production",
-    "MarTech": "marketing automation CRM AI-powered advertising personalization digital marketing analytics customer segmentation",
-    "FoodTech": "food delivery nutrition AI-powered recipes personalized diets meal planning restaurant automation smart kitchen plant-based food technology",
-    "Ecommerce": "online shopping digital storefronts AI-driven product recommendations ecommerce platforms dropshipping order fulfillment payment gateways",
-    "Fashion": "clothing design AI-powered fashion trends retail innovation textile technology sustainable fashion wearable technology",
-    "Prop-Tech": "real estate AI-driven property valuation smart homes proptech property management real estate marketplaces digital land registries",
-    "Automobile": "automotive electric vehicles self-driving AI-powered vehicle systems connected cars car rental ride-sharing mobility solutions",
-    "Bio-Tech": "biotechnology genetic engineering bioinformatics medical research pharmaceuticals biomanufacturing precision medicine gene therapy CRISPR technology",
-    "TravelTech": "travel booking AI-powered itineraries hotel tech smart tourism virtual tourism travel safety location intelligence travel apps",
-    "Security": "surveillance AI-powered threat detection access control biometrics smart security cybersecurity digital identity protection",
-    "EventTech": "event management virtual events AI-powered ticketing audience engagement hybrid events digital event analytics immersive event technology",
-    "Metaverse": "virtual worlds blockchain-powered assets VR experiences decentralized social networks digital avatars digital economy virtual property",
-}
+# 🔹 Build the Domain Artifact Bundle from the Taxonomy File
+# Domain descriptions live in DOMAIN_TAXONOMY_PATH (JSON / YAML / CSV, see domain_taxonomy.py).
+# Embeddings are cached by description hash, so an edit re-encodes only the added or changed
+# domains, in batches; when nothing needs encoding the SBERT model is not even loaded. The bundle
+# is written atomically (staging dir + rename, then CURRENT), and identical content is a no-op.
+#
+#   python ml_model.py                       # after editing domains.json
+#   python ml_model.py --taxonomy subdomains.csv --batch-size 128
 
-# 🔹 Load SBERT Model for Better Embeddings
-sbert_model = SentenceTransformer('all-MiniLM-L6-v2')
+DOMAIN_TAXONOMY_PATH = os.getenv("DOMAIN_TAXONOMY_PATH", "domains.json")
+ARTIFACT_DIR = os.getenv("ARTIFACT_DIR", "artifacts")
+DOMAIN_CACHE_DIR = os.getenv("DOMAIN_CACHE_DIR", ".domain_cache")  # Empty = always re-encode everything
+SBERT_MODEL_ID = os.getenv("SBERT_MODEL_ID", "all-MiniLM-L6-v2")
+ENCODE_BATCH_SIZE = int(os.getenv("ENCODE_BATCH_SIZE", "64"))
 
-# 🔹 Initialize KeyBERT once
-kw_model = KeyBERT()
 
-# 🔹 Function to extract keywords using KeyBERT
-def extract_keywords(text):
-    keywords = kw_model.extract_keywords(text, keyphrase_ngram_range=(1, 3), stop_words='english', top_n=10)
-    return " ".join([kw[0] for kw in keywords])
+# 🔹 Load SBERT Only on the First Encode Call
+class LazyEncoder:
+    def __init__(self, model_id, batch_size):
+        self.model_id = model_id
+        self.batch_size = batch_size
+        self.model = None
+        self.encoded = 0
 
-# 🔹 Extract embeddings directly from domain descriptions
-domain_vectors = np.array([sbert_model.encode(desc) for desc in domains.values()])
+    def __call__(self, texts):
+        if self.model is None:
+            from sentence_transformers import SentenceTransformer
+            start = time.perf_counter()
+            self.model = SentenceTransformer(self.model_id)
+            print(f"✅ Loaded {self.model_id} in {time.perf_counter() - start:.2f}s")
+        self.encoded += len(texts)
+        return self.model.encode(texts, batch_size=self.batch_size, convert_to_numpy=True, show_progress_bar=False)
 
-# 🔹 Train a Nearest Neighbors model for domain matching (K=3 for better results)
-knn = NearestNeighbors(n_neighbors=3, metric='cosine')
-knn.fit(domain_vectors)
 
-# 🔹 Save models
-joblib.dump(sbert_model, "sbert_model.pkl")
-joblib.dump(knn, "knn_model.pkl")
-joblib.dump(list(domains.keys()), "domain_labels.pkl")
+def previous_labels(artifact_dir):
+    try:
+        return set(load_artifact_bundle(artifact_dir).labels)
+    except (OSError, ValueError, KeyError, RuntimeError):
+        return set()
 
-print("✅ Updated Model with New Domains Trained & Saved Successfully!")
\ No newline at end of file
+# ✅ Build (or Refresh) the Bundle; Returns the Manifest
+def build_domain_model(taxonomy_path, artifact_dir, model_id, cache_dir, batch_size):
+    start = time.perf_counter()
+    labels, descriptions = load_taxonomy(taxonomy_path)
+
+    encoder = LazyEncoder(model_id, batch_size)
+    cache = EmbeddingCache(model_id, cache_dir or None, name="domain_embeddings")
+    domain_vectors = cache.embed(descriptions, encoder)
+
+    before = previous_labels(artifact_dir)
+    manifest = write_artifact_bundle(artifact_dir, model_id, labels, domain_vectors)
+
+    added = len(set(labels) - before) if before else len(labels)
+    removed = len(before - set(labels))
+    print(
+        f"✅ {len(labels)} domains from {taxonomy_path}: {encoder.encoded} re-embedded, "
+        f"{added} added, {removed} removed, artifact {manifest['version']} "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+    return manifest
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the domain artifact bundle from a taxonomy file")
+    parser.add_argument("--taxonomy", default=DOMAIN_TAXONOMY_PATH, help="JSON, YAML or CSV taxonomy file")
+    parser.add_argument("--artifact-dir", default=ARTIFACT_DIR)
+    parser.add_argument("--model", default=SBERT_MODEL_ID, help="SentenceTransformer model id")
+    parser.add_argument("--cache-dir", default=DOMAIN_CACHE_DIR, help="Embedding cache directory ('' disables it)")
+    parser.add_argument("--batch-size", type=int, default=ENCODE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    build_domain_model(args.taxonomy, args.artifact_dir, args.model, args.cache_dir, args.batch_size)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import hashlib
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+# 🔹 Normalize Descriptions so Trivial Edits Share a Cache Entry
+# KeyBERT lowercases its candidates and all-MiniLM-L6-v2 is uncased, so case and
+# whitespace differences never change the prediction.
+def normalize_description(text):
+    return " ".join(text.lower().split())
+
+def cache_key(text, variant=""):
+    return hashlib.sha256(f"{variant}\0{normalize_description(text)}".encode("utf-8")).hexdigest()
+
+# 🔹 Rough Memory Footprint of a Cached Value (arrays, strings, containers)
+def estimate_size(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, dict):
+        return sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class _InFlight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+# ✅ Bounded LRU/TTL Cache with Single-Flight Computation
+class PredictionCache:
+    def __init__(self, max_entries=1024, max_bytes=64 * 1024 * 1024, ttl_seconds=3600):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self._entries = OrderedDict()  # key -> (expires_at, size, value)
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    # 🔹 Cached Value or None, Without Computing (lets hits skip the inference queue)
+    def get(self, text, variant=""):
+        with self._lock:
+            value = self._get_locked(cache_key(text, variant))
+            if value is not None:
+                self.hits += 1
+            return value
+
+    # 🔹 `unshared_errors`: exception types tied to the leader's own request (e.g. its deadline); a
+    # follower seeing one retries (leading a new computation itself) instead of re-raising it
+    def get_or_compute(self, text, compute, variant="", unshared_errors=()):
+        key = cache_key(text, variant)
+
+        while True:
+            with self._lock:
+                value = self._get_locked(key)
+                if value is not None:
+                    self.hits += 1
+                    return value
+
+                # 🔹 Collapse Concurrent Identical Requests into One Computation
+                flight = self._inflight.get(key)
+                leader = flight is None
+                if leader:
+                    flight = _InFlight()
+                    self._inflight[key] = flight
+                    self.misses += 1
+                else:
+                    self.coalesced += 1
+
+            if leader:
+                break
+            flight.event.wait()
+            if flight.error is None:
+                return flight.value
+            if not isinstance(flight.error, unshared_errors):
+                raise flight.error
+
+        try:
+            flight.value = compute()
+        except Exception as e:
+            flight.error = e
+            raise
+        else:
+            with self._lock:
+                self._put_locked(key, flight.value)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+
+        return flight.value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _get_locked(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, size, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self._bytes -= size
+            self.expirations += 1
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def _put_locked(self, key, value):
+        size = estimate_size(value)
+        if self.max_entries <= 0 or size > self.max_bytes:
+            return  # 🔹 Never cache a value that could not fit on its own
+
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[1]
+
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, size, value)
+        self._bytes += size
+
+        # 🔹 Evict Least Recently Used Until Both Limits Hold
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
@@ -0,0 +1,332 @@
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import nullcontext
+
+# 🔹 On-Demand Profiling of a Live Worker (admin endpoints in main.py)
+# A session runs for a time window and/or until N matching requests have finished, then writes
+# its output under PROFILE_DIR and switches itself off:
+#   "sample"   a thread samples every thread's stack each `interval` seconds -> collapsed stacks
+#              (`.folded`, for flamegraph.pl / speedscope) plus a top-frames summary
+#   "cprofile" deterministic profiling of the hot path (request, admission job, micro-batch) on
+#              the threads that run it -> pstats `.prof` (snakeviz, `python -m pstats`) + summary.
+#              From Python 3.12 cProfile sits on sys.monitoring, which allows one active profiler
+#              per process and sees every thread, so one shared profile covers the whole session.
+# tracemalloc snapshots are separate and on request only. While no session is running the hooks
+# are a single attribute check, so nothing is profiled and the cost is nil.
+
+PROFILE_MODES = ("sample", "cprofile")
+SHARED_CPROFILE = sys.version_info >= (3, 12)
+IDLE_FILES = ("threading.py", "selectors.py", "queue.py", os.path.join("concurrent", "futures", "thread.py"))
+_NO_SCOPE = nullcontext()
+
+
+class _Session:
+    def __init__(self, mode, seconds, requests, path_prefix, interval, include_idle):
+        self.id = time.strftime("%Y%m%d-%H%M%S") + f"-{int(time.time() * 1000) % 1000:03d}-{os.getpid()}"
+        self.mode = mode
+        self.started = time.time()
+        self.ends_at = time.monotonic() + seconds
+        self.seconds = seconds
+        self.max_requests = requests
+        self.path_prefix = path_prefix
+        self.interval = interval
+        self.include_idle = include_idle
+        self.requests = []  # 🔹 (path, seconds) of matching requests seen during the session
+        self.samples = {}  # 🔹 Collapsed stack -> sample count ("sample" mode)
+        self.sample_rounds = 0
+        self.thread_profiles = {}  # 🔹 Thread id -> [cProfile.Profile, active scope depth, enabled, ever enabled] ("cprofile" mode)
+        self.shared_profile = None  # 🔹 One process-wide profile instead ("cprofile" mode on 3.12+)
+        self.done = threading.Event()
+
+
+class Profiler:
+    def __init__(self, output_dir="profiles", max_seconds=300.0, keep_files=50):
+        self.output_dir = output_dir
+        self.max_seconds = max_seconds
+        self.keep_files = keep_files
+        self.session = None
+        self.last_report = None
+        self._lock = threading.Lock()
+        self._last_snapshot = None
+
+    # ✅ Start a Session: Stops After `seconds` (capped at max_seconds) or `requests` Matching Requests
+    def start(self, mode="sample", seconds=30.0, requests=None, path_prefix="/predict", interval=0.005, include_idle=False):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"❌ Unknown profile mode '{mode}'. Use one of: {', '.join(PROFILE_MODES)}.")
+        seconds = min(float(seconds or self.max_seconds), self.max_seconds)
+        with self._lock:
+            if self.session is not None:
+                raise RuntimeError("❌ A profiling session is already running.")
+            session = _Session(mode, seconds, requests, path_prefix, max(interval, 0.001), include_idle)
+            if mode == "cprofile" and SHARED_CPROFILE:
+                session.shared_profile = cProfile.Profile()
+                try:
+                    session.shared_profile.enable()
+                except ValueError as e:
+                    raise RuntimeError(f"❌ Cannot start cProfile: {e}.")
+            self.session = session
+
+        target = self._sample if mode == "sample" else self._wait_for_window
+        threading.Thread(target=target, args=(session,), name="profiler", daemon=True).start()
+        return self.status()
+
+    # ✅ Stop the Running Session, Write Its Output and Return the Report (None if nothing was running)
+    def stop(self):
+        with self._lock:
+            session, self.session = self.session, None
+        if session is None:
+            return None
+        session.done.set()
+        if session.shared_profile is not None:
+            session.shared_profile.disable()
+        report = self._write(session)
+        self.last_report = report
+        return report
+
+    def status(self):
+        session = self.session
+        if session is None:
+            return {"active": False, "last_report": self.last_report}
+        return {
+            "active": True,
+            "id": session.id,
+            "mode": session.mode,
+            "seconds_left": round(max(0.0, session.ends_at - time.monotonic()), 1),
+            "requests_seen": len(session.requests),
+            "max_requests": session.max_requests,
+            "path_prefix": session.path_prefix,
+        }
+
+    # 🔹 Hot-Path Hook: Profile the Enclosed Work on This Thread During a "cprofile" Session
+    def thread_scope(self):
+        session = self.session
+        if session is None or session.mode != "cprofile" or session.shared_profile is not None:
+            return _NO_SCOPE
+        return self._profile_thread(session)
+
+    # 🔹 Called by ProfilerMiddleware for Every Finished Request While a Session Runs
+    def request_finished(self, session, path, seconds):
+        if not path.startswith(session.path_prefix):
+            return
+        session.requests.append((path, seconds))
+        if session.max_requests and len(session.requests) >= session.max_requests and not session.done.is_set():
+            session.done.set()
+            threading.Thread(target=self._stop_session, args=(session,), name="profiler-stop", daemon=True).start()
+
+    def _stop_session(self, session):
+        if self.session is session:
+            self.stop()
+
+    def _wait_for_window(self, session):
+        if not session.done.wait(max(0.0, session.ends_at - time.monotonic())):
+            self._stop_session(session)
+
+    # 🔹 Stack Sampler: Walks sys._current_frames() of Every Other Thread Each Interval
+    def _sample(self, session):
+        own = threading.get_ident()
+        while not session.done.is_set():
+            if time.monotonic() >= session.ends_at:
+                self._stop_session(session)
+                return
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                if not session.include_idle and frame.f_code.co_filename.endswith(IDLE_FILES):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                key = ";".join([names.get(ident, str(ident))] + stack[::-1])
+                session.samples[key] = session.samples.get(key, 0) + 1
+            session.sample_rounds += 1
+            session.done.wait(session.interval)
+
+    def _profile_thread(self, session):
+        ident = threading.get_ident()
+        entry = session.thread_profiles.get(ident)
+        if entry is None:
+            entry = session.thread_profiles.setdefault(ident, [cProfile.Profile(), 0, False, False])
+        return _ThreadScope(session, entry)
+
+    # ✅ Output Files: <id>.folded or <id>.prof, Plus a Readable <id>.txt Summary
+    def _write(self, session):
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, f"profile-{session.id}")
+        report = {
+            "id": session.id,
+            "mode": session.mode,
+            "duration_seconds": round(time.time() - session.started, 3),
+            "requests": len(session.requests),
+            "slowest_requests_ms": [
+                {"path": path, "ms": round(seconds * 1000, 3)}
+                for path, seconds in sorted(session.requests, key=lambda r: -r[1])[:10]
+            ],
+            "files": [],
+        }
+        if session.mode == "sample":
+            summary = self._write_samples(session, base + ".folded")
+            report["samples"] = sum(session.samples.values())
+            report["files"].append(base + ".folded")
+        else:
+            summary = self._write_pstats(session, base + ".prof")
+            report["threads_profiled"] = "all" if session.shared_profile is not None else len(session.thread_profiles)
+            if summary is not None:
+                report["files"].append(base + ".prof")
+        with open(base + ".txt", "w") as f:
+            f.write(summary or "No profiled work was recorded.\n")
+        report["files"].append(base + ".txt")
+        self._prune()
+        return report
+
+    def _write_samples(self, session, path):
+        _atomic_write(path, "".join(f"{stack} {count}\n" for stack, count in sorted(session.samples.items())))
+        # 🔹 Summary: Frames by Inclusive Share of Samples
+        total = sum(session.samples.values()) or 1
+        inclusive = {}
+        for stack, count in session.samples.items():
+            for frame in set(stack.split(";")[1:]):
+                inclusive[frame] = inclusive.get(frame, 0) + count
+        lines = [f"{session.sample_rounds} sampling rounds, {total} samples, every {session.interval * 1000:.1f} ms\n"]
+        for frame, count in sorted(inclusive.items(), key=lambda item: -item[1])[:40]:
+            lines.append(f"{count / total:7.1%}  {frame}\n")
+        return "".join(lines)
+
+    def _write_pstats(self, session, path):
+        if session.shared_profile is not None:
+            try:
+                return self._dump_pstats(pstats.Stats(session.shared_profile), path)
+            except TypeError:
+                return None  # 🔹 Nothing ran while it was enabled
+        # 🔹 A Thread Still Inside a Scope Has Its Profile Enabled; Give It a Moment to Finish
+        deadline = time.monotonic() + 2.0
+        while any(entry[1] for entry in session.thread_profiles.values()) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        stats = None
+        for profile, depth, _enabled, used in list(session.thread_profiles.values()):
+            if depth or not used:
+                continue  # 🔹 Still running on its thread (disabling it from here is not safe), or never enabled
+            stats = pstats.Stats(profile) if stats is None else stats.add(profile)
+        if stats is None:
+            return None
+        return self._dump_pstats(stats, path)
+
+    def _dump_pstats(self, stats, path):
+        stats.dump_stats(path + ".tmp")
+        os.replace(path + ".tmp", path)
+        out = io.StringIO()
+        stats.stream = out
+        stats.sort_stats("cumulative").print_stats(40)
+        return out.getvalue()
+
+    # 🔹 Keep Only the Newest `keep_files` Outputs
+    def _prune(self):
+        try:
+            files = sorted(
+                (os.path.join(self.output_dir, name) for name in os.listdir(self.output_dir) if name.startswith(("profile-", "tracemalloc-"))),
+                key=os.path.getmtime,
+            )
+            for old in files[:-self.keep_files]:
+                os.remove(old)
+        except OSError:
+            pass
+
+    # ✅ tracemalloc: Start Tracing on First Use, Dump a Snapshot and Return the Top Allocation Sites
+    # (and growth since the previous snapshot). Tracing costs memory and CPU until stop_tracemalloc().
+    def tracemalloc_snapshot(self, frames=10, top=20):
+        started = False
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            self._last_snapshot = None
+            started = True
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ])
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"tracemalloc-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.snapshot")
+        snapshot.dump(path)
+
+        current, peak = tracemalloc.get_traced_memory()
+        report = {
+            "started_tracing": started,
+            "traced_bytes": current,
+            "peak_traced_bytes": peak,
+            "file": path,
+            "top": [_stat_entry(stat) for stat in snapshot.statistics("lineno")[:top]],
+        }
+        if self._last_snapshot is not None:
+            report["growth"] = [_stat_entry(stat) for stat in snapshot.compare_to(self._last_snapshot, "lineno")[:top]]
+        self._last_snapshot = snapshot
+        self._prune()
+        return report
+
+    def stop_tracemalloc(self):
+        was_tracing = tracemalloc.is_tracing()
+        tracemalloc.stop()
+        self._last_snapshot = None
+        return {"was_tracing": was_tracing}
+
+
+class _ThreadScope:
+    def __init__(self, session, entry):
+        self.session = session
+        self.entry = entry
+
+    def __enter__(self):
+        if self.entry[1] == 0 and not self.session.done.is_set():
+            try:
+                self.entry[0].enable()
+                self.entry[2] = self.entry[3] = True
+            except ValueError:
+                pass  # 🔹 Another profiler is active (sys.monitoring allows one): run the work unprofiled
+        self.entry[1] += 1
+
+    def __exit__(self, *exc):
+        self.entry[1] -= 1
+        if self.entry[1] == 0 and self.entry[2]:
+            self.entry[0].disable()
+            self.entry[2] = False
+        return False
+
+
+def _stat_entry(stat):
+    frame = stat.traceback[0]
+    entry = {"location": f"{frame.filename}:{frame.lineno}", "size_bytes": stat.size, "count": stat.count}
+    if hasattr(stat, "size_diff"):
+        entry["size_diff_bytes"] = stat.size_diff
+        entry["count_diff"] = stat.count_diff
+    return entry
+
+def _atomic_write(path, text):
+    with open(path + ".tmp", "w") as f:
+        f.write(text)
+    os.replace(path + ".tmp", path)
+
+
+# ✅ ASGI Middleware: Profiles the Request Itself During a "cprofile" Session and Counts Finished
+# Requests Toward a Session's Limit; One Attribute Check per Request When Profiling Is Off
+class ProfilerMiddleware:
+    def __init__(self, app, profiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        session = self.profiler.session
+        if session is None or scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        try:
+            with self.profiler.thread_scope():
+                await self.app(scope, receive, send)
+        finally:
+            self.profiler.request_finished(session, scope["path"], time.perf_counter() - start)
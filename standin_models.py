@@ -0,0 +1,123 @@
+import hashlib
+import os
+import re
+import sys
+import types
+
+import numpy as np
+
+# 🔹 Deterministic Stand-Ins for SentenceTransformer & KeyBERT (benchmarks only)
+# They expose the calls main.py makes, need no downloads, and always return the same
+# vectors for the same text. Each token gets a fixed pseudo-random vector and a text is
+# the normalized sum of its tokens, so texts sharing words still land close together.
+# STANDIN_ENCODER_LAYERS adds transformer-sized matrix work per token (default 2) so
+# batching and concurrency behave like a real forward pass; 0 makes encoding nearly free.
+
+STANDIN_DIM = 384
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+class StandInSentenceTransformer:
+    def __init__(self, model_name_or_path=None, dim=STANDIN_DIM, layers=None, **kwargs):
+        self.model_name = model_name_or_path
+        self.dim = dim
+        self.layers = int(os.getenv("STANDIN_ENCODER_LAYERS", "2")) if layers is None else layers
+        rng = np.random.default_rng(0)
+        self._up = rng.standard_normal((dim, 4 * dim)).astype(np.float32) / np.sqrt(dim)
+        self._down = rng.standard_normal((4 * dim, dim)).astype(np.float32) / np.sqrt(4 * dim)
+        self._token_vectors = {}
+
+    def get_sentence_embedding_dimension(self):
+        return self.dim
+
+    def _token_vector(self, token):
+        vector = self._token_vectors.get(token)
+        if vector is None:
+            seed = int.from_bytes(hashlib.sha256(token.encode("utf-8")).digest()[:8], "little")
+            vector = np.random.default_rng(seed).standard_normal(self.dim).astype(np.float32)
+            self._token_vectors[token] = vector
+        return vector
+
+    def encode(self, sentences, batch_size=32, show_progress_bar=None, convert_to_numpy=True, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+
+        token_lists = [TOKEN_PATTERN.findall(text.lower()) or [""] for text in texts]
+        tokens = np.stack([self._token_vector(token) for token_list in token_lists for token in token_list])
+
+        # 🔹 Simulated Feed-Forward Layers over Every Token of the Batch at Once
+        hidden = tokens
+        for _ in range(self.layers):
+            hidden = hidden + np.maximum(hidden @ self._up, 0) @ self._down * 1e-3
+
+        offsets = np.cumsum([0] + [len(token_list) for token_list in token_lists])
+        pooled = np.add.reduceat(hidden, offsets[:-1], axis=0)
+        pooled /= np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+        return pooled[0] if single else pooled
+
+
+class _StandInBackend:
+    def __init__(self, embedding_model):
+        self.embedding_model = embedding_model
+
+    def embed(self, documents, verbose=False):
+        return self.embedding_model.encode(documents)
+
+
+# 🔹 Candidate n-grams via CountVectorizer Ranked by Cosine to the Document (KeyBERT's default path)
+class StandInKeyBERT:
+    def __init__(self, model=None):
+        if model is None or isinstance(model, str):
+            model = StandInSentenceTransformer(model)
+        self.model = _StandInBackend(model)
+
+    def _vectorizer(self, docs, keyphrase_ngram_range, stop_words):
+        from sklearn.feature_extraction.text import CountVectorizer
+        try:
+            return CountVectorizer(ngram_range=keyphrase_ngram_range, stop_words=stop_words).fit(docs)
+        except ValueError:  # 🔹 Only stop words / empty documents
+            return None
+
+    def extract_embeddings(self, docs, keyphrase_ngram_range=(1, 1), stop_words="english", **kwargs):
+        docs = [docs] if isinstance(docs, str) else docs
+        vectorizer = self._vectorizer(docs, keyphrase_ngram_range, stop_words)
+        words = list(vectorizer.get_feature_names_out()) if vectorizer is not None else []
+        doc_embeddings = self.model.embed(docs)
+        word_embeddings = self.model.embed(words) if words else np.zeros((0, doc_embeddings.shape[1]), dtype=np.float32)
+        return doc_embeddings, word_embeddings
+
+    def extract_keywords(self, docs, keyphrase_ngram_range=(1, 1), stop_words="english", top_n=5,
+                         doc_embeddings=None, word_embeddings=None, **kwargs):
+        single = isinstance(docs, str)
+        docs = [docs] if single else docs
+        if doc_embeddings is None or word_embeddings is None:
+            doc_embeddings, word_embeddings = self.extract_embeddings(docs, keyphrase_ngram_range, stop_words)
+
+        vectorizer = self._vectorizer(docs, keyphrase_ngram_range, stop_words)
+        if vectorizer is None:
+            keywords = [[] for _ in docs]
+        else:
+            words = vectorizer.get_feature_names_out()
+            counts = vectorizer.transform(docs)
+            keywords = []
+            for row, doc_embedding in enumerate(np.asarray(doc_embeddings).reshape(len(docs), -1)):
+                candidates = counts[row].nonzero()[1]
+                scores = word_embeddings[candidates] @ doc_embedding
+                best = np.argsort(-scores)[:top_n]
+                keywords.append([(words[candidates[i]], round(float(scores[i]), 4)) for i in best])
+
+        # 🔹 Same Shape Quirk as KeyBERT: a Flat List for a Single Document
+        return keywords[0] if len(keywords) == 1 else keywords
+
+
+# ✅ Make `from sentence_transformers import SentenceTransformer` & `from keybert import KeyBERT`
+# Resolve to the Stand-Ins (call before importing main)
+def install():
+    sentence_transformers = types.ModuleType("sentence_transformers")
+    sentence_transformers.SentenceTransformer = StandInSentenceTransformer
+    keybert = types.ModuleType("keybert")
+    keybert.KeyBERT = StandInKeyBERT
+    sys.modules["sentence_transformers"] = sentence_transformers
+    sys.modules["keybert"] = keybert